@@ -13,6 +13,44 @@ DB_USER = os.environ.get('POSTGRES_USER')
 
 REDIS_HOST = os.environ.get('REDIS_HOST')
 REDIS_PORT = os.environ.get('REDIS_PORT')
-REDIS_DB = os.environ.get('REDIS_HOST')
+REDIS_DB = os.environ.get('REDIS_DB', '0')
+REDIS_MAX_CONNECTIONS = int(os.environ.get('REDIS_MAX_CONNECTIONS', 50))
+# Сколько секунд запрос ждет свободное соединение, когда все соединения пула заняты.
+REDIS_POOL_TIMEOUT = int(os.environ.get('REDIS_POOL_TIMEOUT', 5))
+REDIS_SOCKET_TIMEOUT = float(os.environ.get('REDIS_SOCKET_TIMEOUT', 5))
+REDIS_SOCKET_CONNECT_TIMEOUT = float(os.environ.get('REDIS_SOCKET_CONNECT_TIMEOUT', 5))
+
+LOCAL_CACHE_ENABLED = os.environ.get('LOCAL_CACHE_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+LOCAL_CACHE_TTL = float(os.environ.get('LOCAL_CACHE_TTL', 5))
+LOCAL_CACHE_MAX_BYTES = int(os.environ.get('LOCAL_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+
+CACHE_FILL_LOCK_TIMEOUT = float(os.environ.get('CACHE_FILL_LOCK_TIMEOUT', 5))
+CACHE_FILL_POLL_INTERVAL = float(os.environ.get('CACHE_FILL_POLL_INTERVAL', 0.05))
+CACHE_TTL_DEFAULT = float(os.environ.get('CACHE_TTL_DEFAULT', 60))
+CACHE_TTL_MENU = float(os.environ.get('CACHE_TTL_MENU', CACHE_TTL_DEFAULT))
+CACHE_TTL_SUBMENU = float(os.environ.get('CACHE_TTL_SUBMENU', CACHE_TTL_DEFAULT))
+CACHE_TTL_DISH = float(os.environ.get('CACHE_TTL_DISH', CACHE_TTL_DEFAULT))
+CACHE_TTL_FULL_MENU = float(os.environ.get('CACHE_TTL_FULL_MENU', CACHE_TTL_DEFAULT))
+CACHE_STALE_TTL = float(os.environ.get('CACHE_STALE_TTL', 30))
+CACHE_TTL_JITTER = float(os.environ.get('CACHE_TTL_JITTER', 0.1))
+
+PAGE_SIZE_DEFAULT = int(os.environ.get('PAGE_SIZE_DEFAULT', 100))
+PAGE_SIZE_MAX = int(os.environ.get('PAGE_SIZE_MAX', 1000))
 
 RABBITMQ_HOST = os.environ.get('RABBITMQ_HOST')
+
+# Токен для эндпоинтов администрирования; пустой токен отключает их.
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+
+# Источник меню для фоновой синхронизации: google sheets (sheet) или локальная книга (xlsx).
+MENU_SOURCE = os.environ.get('MENU_SOURCE', 'sheet')
+MENU_XLSX_PATH = os.environ.get('MENU_XLSX_PATH', 'admin/Menu.xlsx')
+# Beat — запасной механизм, основной запуск синхронизации идет через POST /api/v1/admin/sync.
+SYNC_BEAT_INTERVAL = float(os.environ.get('SYNC_BEAT_INTERVAL', 300))
+# Запросы на синхронизацию, пришедшие в течение этого окна, объединяются в один запуск.
+SYNC_DEBOUNCE = float(os.environ.get('SYNC_DEBOUNCE', 2))
+SYNC_LEASE_TTL = float(os.environ.get('SYNC_LEASE_TTL', 60))
+# Следующий запуск не раньше, чем через столько средних длительностей последних запусков.
+SYNC_INTERVAL_FACTOR = float(os.environ.get('SYNC_INTERVAL_FACTOR', 4))
+# Верхняя граница должна быть заметно больше SYNC_BEAT_INTERVAL, иначе запуски не откладываются.
+SYNC_INTERVAL_MAX = float(os.environ.get('SYNC_INTERVAL_MAX', 3600))
@@ -1,6 +1,10 @@
-from typing import AsyncGenerator
+import os
+from typing import Any, AsyncGenerator, Awaitable, Callable
 
 import aioredis
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
 
@@ -10,10 +14,18 @@ from app.config import (
     DB_PASS,
     DB_PORT,
     DB_USER,
+    LOCAL_CACHE_ENABLED,
+    LOCAL_CACHE_MAX_BYTES,
+    LOCAL_CACHE_TTL,
     REDIS_DB,
     REDIS_HOST,
+    REDIS_MAX_CONNECTIONS,
+    REDIS_POOL_TIMEOUT,
     REDIS_PORT,
+    REDIS_SOCKET_CONNECT_TIMEOUT,
+    REDIS_SOCKET_TIMEOUT,
 )
+from app.repositories.local_cache import LocalCache
 
 DATABASE_URL = f'postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
 Base = declarative_base()
@@ -21,22 +33,84 @@ Base = declarative_base()
 engine = create_async_engine(DATABASE_URL)
 async_session_maker = async_sessionmaker(bind=engine, expire_on_commit=False)
 
+ALEMBIC_CONFIG = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'alembic.ini')
+
 REDIS_URL = f'redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}'
 
+redis_client: aioredis.Redis | None = None
+local_cache: LocalCache | None = None
+
+
+def init_redis_pool() -> aioredis.Redis:
+    """Создание общего для процесса клиента Redis с пулом соединений."""
+    global redis_client
+    if redis_client is None:
+        # При исчерпании пула запрос ждет освободившееся соединение, а не получает ошибку.
+        # Одно соединение постоянно занимает подписка на канал инвалидации кэша в памяти.
+        pool = aioredis.BlockingConnectionPool.from_url(
+            REDIS_URL,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            timeout=REDIS_POOL_TIMEOUT,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=REDIS_SOCKET_CONNECT_TIMEOUT,
+        )
+        redis_client = aioredis.Redis(connection_pool=pool)
+    return redis_client
+
+
+async def close_redis_pool() -> None:
+    """Закрытие всех соединений пула Redis."""
+    global redis_client
+    if redis_client is not None:
+        await redis_client.close()
+        await redis_client.connection_pool.disconnect()
+        redis_client = None
+
 
 async def get_redis_connection() -> aioredis.Redis:
-    """Создание соединения с Redis."""
-    redis = aioredis.from_url(REDIS_URL, encoding='utf-8', decode_responses=True)
-    return redis
+    """Получение клиента Redis из общего пула соединений."""
+    return init_redis_pool()
+
 
+def init_local_cache() -> LocalCache | None:
+    """Создание общего для процесса кэша в памяти, если он включен в настройках."""
+    global local_cache
+    if local_cache is None and LOCAL_CACHE_ENABLED:
+        local_cache = LocalCache(max_bytes=LOCAL_CACHE_MAX_BYTES, ttl=LOCAL_CACHE_TTL)
+    return local_cache
 
-async def create_db_and_tables() -> None:
-    """Создание базы данных и таблиц при запуске."""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+
+async def get_local_cache() -> LocalCache | None:
+    """Получение кэша в памяти процесса, если он включен."""
+    return init_local_cache()
+
+
+async def check_schema_version() -> None:
+    """Проверка при запуске, что схема базы данных применена до последней миграции."""
+    head_revision = ScriptDirectory.from_config(Config(ALEMBIC_CONFIG)).get_current_head()
+    async with engine.connect() as conn:
+        current_revision = await conn.run_sync(
+            lambda sync_conn: MigrationContext.configure(sync_conn).get_current_revision()
+        )
+    if current_revision != head_revision:
+        raise RuntimeError(
+            f'database schema version {current_revision} does not match {head_revision}, '
+            'run "alembic upgrade head"'
+        )
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     """Получение асинхронной сессии для работы с базой данных."""
     async with async_session_maker() as session:
         yield session
+
+
+def in_new_session(repository_class: type, load: Callable[[Any], Awaitable[bytes]]) -> Callable[[], Awaitable[bytes]]:
+    """Оборачивает построение значения кэша, чтобы оно выполнялось в собственной сессии базы данных.
+
+    Нужно для фонового обновления кэша, которое переживает сессию запроса.
+    """
+    async def run() -> bytes:
+        async with async_session_maker() as session:
+            return await load(repository_class(session=session))
+    return run
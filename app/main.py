@@ -1,7 +1,44 @@
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+
+from app.database import (
+    check_schema_version,
+    close_redis_pool,
+    engine,
+    init_local_cache,
+    init_redis_pool,
+)
+from app.routers import (
+    router_admin,
+    router_dish,
+    router_full_menu,
+    router_menu,
+    router_submenu,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Проверяет схему базы данных, создает пул Redis при запуске и освобождает ресурсы при остановке."""
+    await check_schema_version()
+    redis = init_redis_pool()
+    local_cache = init_local_cache()
+    invalidation_listener = None
+    if local_cache is not None:
+        invalidation_listener = asyncio.create_task(local_cache.listen(redis))
+    yield
+    if invalidation_listener is not None:
+        invalidation_listener.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await invalidation_listener
+    await close_redis_pool()
+    await engine.dispose()
 
-from app.database import create_db_and_tables
-from app.routers import router_dish, router_full_menu, router_menu, router_submenu
 
 app = FastAPI(
     title='Меню ресторана',
@@ -16,20 +53,20 @@ app = FastAPI(
     }, {
         'name': 'Dishes',
         'description': 'Операции с блюдами.',
-    }]
+    }, {
+        'name': 'Admin',
+        'description': 'Администрирование: запуск синхронизации меню.',
+    }],
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 
-@app.on_event('startup')
-async def on_startup() -> None:
-    """Инициализирует базу данных при запуске приложения."""
-    await create_db_and_tables()
-
-
 app.include_router(router_menu.router)
 app.include_router(router_submenu.router)
 app.include_router(router_dish.router)
 app.include_router(router_full_menu.router)
+app.include_router(router_admin.router)
 
 
 @app.get('/')
@@ -1,8 +1,17 @@
 import uuid
 
-from sqlalchemy import Column, ForeignKey, String
+from sqlalchemy import (
+    CheckConstraint,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    func,
+)
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import column_property, relationship
 
 from app.database import Base
 
@@ -12,24 +21,36 @@ class Menu(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String, nullable=False)
     description = Column(String, nullable=False)
+    submenus_count = Column(Integer, nullable=False, default=0, server_default='0')
+    dishes_count = Column(Integer, nullable=False, default=0, server_default='0')
     submenus = relationship('Submenu', back_populates='menu', cascade='all, delete')
 
 
 class Submenu(Base):
     __tablename__ = 'submenu'
+    __table_args__ = (Index('ix_submenu_menu_id', 'menu_id', 'id'),)
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String, nullable=False)
     description = Column(String, nullable=False)
     menu_id = Column(UUID(as_uuid=True), ForeignKey('menu.id', ondelete='CASCADE'))
+    dishes_count = Column(Integer, nullable=False, default=0, server_default='0')
     menu = relationship('Menu', back_populates='submenus')
     dishes = relationship('Dish', back_populates='submenu', cascade='all, delete')
 
 
 class Dish(Base):
     __tablename__ = 'dish'
+    __table_args__ = (
+        Index('ix_dish_submenu_id', 'submenu_id', 'id'),
+        CheckConstraint('discount >= 0 AND discount <= 100', name='ck_dish_discount_range'),
+    )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String, nullable=False)
     description = Column(String, nullable=False)
-    price = Column(String, nullable=False)
+    price = Column(Numeric(10, 2), nullable=False)
+    discount = Column(Numeric(5, 2), nullable=False, default=0, server_default='0')
     submenu_id = Column(UUID(as_uuid=True), ForeignKey('submenu.id', ondelete='CASCADE'))
+    effective_price = column_property(
+        func.round(func.greatest(0, price * (100 - discount) / 100), 2, type_=Numeric(10, 2))
+    )
     submenu = relationship('Submenu', back_populates='dishes')
@@ -1,35 +1,342 @@
+import asyncio
+import logging
+import math
+import random
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+
 from aioredis import Redis
 
+from app.config import (
+    CACHE_FILL_LOCK_TIMEOUT,
+    CACHE_FILL_POLL_INTERVAL,
+    CACHE_STALE_TTL,
+    CACHE_TTL_DEFAULT,
+    CACHE_TTL_JITTER,
+)
+from app.repositories.local_cache import INVALIDATION_CHANNEL, LocalCache
+from app.repositories.serializers import OrjsonSerializer, Serializer
+
+logger = logging.getLogger(__name__)
+
+# Счетчик поколения должен жить дольше любого ключа, в который он встроен.
+GENERATION_EXPIRE = 24 * 60 * 60
+# Меняется при каждой очистке Redis, чтобы сброшенные счетчики версий не совпали со старыми ETag.
+VERSION_EPOCH_KEY = 'version:epoch'
+
+# Снимает блокировку заполнения, только если она все еще принадлежит этому вызову.
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Заполнения кэша, выполняющиеся в этом процессе, общие для всех экземпляров репозитория.
+_fills: dict[tuple[str, str | None], asyncio.Future] = {}
+# Фоновые обновления устаревших значений; ссылки на задачи держим, чтобы их не собрал сборщик мусора.
+_refreshes: set[tuple[str, str | None]] = set()
+_refresh_tasks: set[asyncio.Task] = set()
+
 
 class CacheRepository:
-    def __init__(self, redis: Redis) -> None:
-        """Инициализация репозитория кэша с экземпляром Redis."""
+    def __init__(
+            self,
+            redis: Redis,
+            local_cache: LocalCache | None = None,
+            serializer: Serializer | None = None
+    ) -> None:
+        """Инициализация репозитория кэша с экземпляром Redis, опциональным кэшем в памяти процесса
+        и сериализатором значений (по умолчанию orjson)."""
         self.redis = redis
+        self.local_cache = local_cache
+        self.serializer = serializer or OrjsonSerializer()
+
+    async def get_or_fill(
+            self,
+            key: str,
+            fill: Callable[[], Awaitable[bytes]],
+            field: str | None = None,
+            ttl: float = CACHE_TTL_DEFAULT,
+            refresh: Callable[[], Awaitable[bytes]] | None = None
+    ) -> bytes:
+        """Получение значения из кэша, при промахе значение строит только один вызывающий.
+
+        Конкурентные запросы этого процесса ждут его результат, другие воркеры ждут,
+        пока значение появится в Redis, пока блокировка заполнения не освободится.
+        Значение старше мягкого TTL отдается сразу, а в фоне обновляется через refresh
+        (по умолчанию fill); после жесткого TTL значение считается отсутствующим.
+        """
+        entry = await self._read(key, field)
+        if entry is not None:
+            value, is_stale = entry
+            if is_stale:
+                self._schedule_refresh(key, refresh or fill, field, ttl)
+            return value
 
-    async def get(self, key: str) -> str | None:
-        """Получение значения по ключу из Redis."""
-        return await self.redis.get(key)
+        fill_key = (key, field)
+        while fill_key in _fills:
+            filling = _fills[fill_key]
+            try:
+                return await asyncio.shield(filling)
+            except asyncio.CancelledError:
+                if not filling.cancelled():
+                    raise
+                # Заполнявший запрос отменили (например, клиент отключился), заполнение берет один из ожидающих.
 
-    async def set(self, key: str, value: str, expire: int | None = None) -> None:
-        """Установка значения по ключу в Redis с опциональным временем истечения."""
-        if expire is not None:
-            await self.redis.set(key, value, ex=expire)
+        future = asyncio.get_running_loop().create_future()
+        _fills[fill_key] = future
+        try:
+            value = await self._fill_once(key, fill, field, ttl)
+        except Exception as exc:
+            future.set_exception(exc)
+            # Исключение получит сам вызывающий, ожидающих может и не быть.
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
         else:
-            await self.redis.set(key, value)
-
-    async def delete(self, key: str) -> None:
-        """Удаление значения по ключу из Redis."""
-        await self.redis.delete(key)
-
-    async def delete_pattern(self, pattern: str) -> None:
-        """Удаление значений по шаблону ключа из Redis."""
-        has_next = True
-        cursor = 0
-        while has_next:
-            cursor, keys = await self.redis.scan(cursor=cursor, match=pattern, count=100)
-            if keys:
-                await self.redis.delete(*keys)
-            has_next = (cursor != 0)
+            future.set_result(value)
+            return value
+        finally:
+            del _fills[fill_key]
+
+    async def store(self, key: str, value: bytes, field: str | None = None, ttl: float = CACHE_TTL_DEFAULT) -> None:
+        """Сохранение значения с мягким и жестким TTL, к обоим добавляется случайный разброс."""
+        soft_ttl = ttl * random.uniform(1 - CACHE_TTL_JITTER, 1 + CACHE_TTL_JITTER)
+        hard_ttl = soft_ttl + CACHE_STALE_TTL
+        now = time.time()
+        envelope = b'%d:%d|' % ((now + soft_ttl) * 1000, (now + hard_ttl) * 1000) + value
+        if field is None:
+            await self.set(key, envelope, expire=math.ceil(hard_ttl))
+        else:
+            await self.hset(key, field, envelope, expire=math.ceil(hard_ttl))
+
+    async def store_object(
+            self,
+            key: str,
+            value: Any,
+            field: str | None = None,
+            ttl: float = CACHE_TTL_DEFAULT
+    ) -> None:
+        """Сериализация значения и сохранение его с мягким и жестким TTL."""
+        await self.store(key, self.serializer.dumps(value), field=field, ttl=ttl)
+
+    async def _read(self, key: str, field: str | None) -> tuple[bytes, bool] | None:
+        """Возвращает значение и признак того, что истек его мягкий TTL, или None после жесткого TTL."""
+        envelope = await self.get(key) if field is None else await self.hget(key, field)
+        if envelope is None:
+            return None
+        header, _, value = envelope.partition(b'|')
+        soft_deadline, _, hard_deadline = header.partition(b':')
+        now = time.time() * 1000
+        if now >= int(hard_deadline):
+            return None
+        return value, now >= int(soft_deadline)
+
+    def _schedule_refresh(
+            self,
+            key: str,
+            refresh: Callable[[], Awaitable[bytes]],
+            field: str | None,
+            ttl: float
+    ) -> None:
+        """Запускает фоновое обновление значения, если оно еще не выполняется в этом процессе."""
+        fill_key = (key, field)
+        if fill_key in _fills or fill_key in _refreshes:
+            return
+        _refreshes.add(fill_key)
+        task = asyncio.create_task(self._refresh(key, refresh, field, ttl))
+        _refresh_tasks.add(task)
+        task.add_done_callback(_refresh_tasks.discard)
+        task.add_done_callback(lambda _: _refreshes.discard(fill_key))
+
+    async def _refresh(
+            self,
+            key: str,
+            refresh: Callable[[], Awaitable[bytes]],
+            field: str | None,
+            ttl: float
+    ) -> None:
+        """Обновляет значение под блокировкой в Redis, если его уже не обновляет другой воркер."""
+        lock_key = self._lock_key(key, field)
+        token = uuid.uuid4().hex
+        if not await self.redis.set(lock_key, token, nx=True, px=int(CACHE_FILL_LOCK_TIMEOUT * 1000)):
+            return
+        try:
+            await self.store(key, await refresh(), field=field, ttl=ttl)
+        except Exception:
+            logger.exception('background refresh of cache key %s failed', key)
+        finally:
+            await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+    async def _fill_once(
+            self,
+            key: str,
+            fill: Callable[[], Awaitable[bytes]],
+            field: str | None,
+            ttl: float
+    ) -> bytes:
+        """Строит значение под блокировкой в Redis или дожидается значения, построенного другим воркером."""
+        lock_key = self._lock_key(key, field)
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + CACHE_FILL_LOCK_TIMEOUT
+        while not await self.redis.set(lock_key, token, nx=True, px=int(CACHE_FILL_LOCK_TIMEOUT * 1000)):
+            await asyncio.sleep(CACHE_FILL_POLL_INTERVAL)
+            entry = await self._read(key, field)
+            if entry is not None:
+                return entry[0]
+            if time.monotonic() > deadline:
+                # Воркер с блокировкой завис или упал, строим значение сами.
+                break
+
+        try:
+            # Другой воркер мог заполнить ключ и отпустить блокировку между нашим чтением и SET NX.
+            entry = await self._read(key, field)
+            if entry is not None:
+                return entry[0]
+            value = await fill()
+            await self.store(key, value, field=field, ttl=ttl)
+            return value
+        finally:
+            await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+    @staticmethod
+    def _lock_key(key: str, field: str | None) -> str:
+        return f'lock:{key}' if field is None else f'lock:{key}:{field}'
+
+    async def get(self, key: str) -> bytes | None:
+        """Получение значения по ключу из памяти процесса или из Redis."""
+        if self.local_cache is not None:
+            value = self.local_cache.get(key)
+            if value is not None:
+                return value
+        value = await self.redis.get(key)
+        if value is not None and self.local_cache is not None:
+            self.local_cache.set(key, value)
+        return value
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        """Получение значений по списку ключей из памяти процесса или из Redis за один запрос MGET."""
+        values = [self.local_cache.get(key) if self.local_cache is not None else None for key in keys]
+        missing_keys = [key for key, value in zip(keys, values) if value is None]
+        if not missing_keys:
+            return values
+
+        missing_values = iter(await self.redis.mget(missing_keys))
+        for index, value in enumerate(values):
+            if value is None:
+                values[index] = next(missing_values)
+                if values[index] is not None and self.local_cache is not None:
+                    self.local_cache.set(keys[index], values[index])
+        return values
+
+    async def get_generations(self, *names: str) -> list[int]:
+        """Получение текущих поколений пространств имен кэша."""
+        values = await self.get_many([f'generation:{name}' for name in names])
+        return [int(value or 0) for value in values]
+
+    async def bump_generations(self, *names: str) -> None:
+        """Увеличение поколений пространств имен, после чего все их ключи перестают читаться."""
+        keys = [f'generation:{name}' for name in names]
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for key in keys:
+                pipe.incr(key)
+                pipe.expire(key, GENERATION_EXPIRE)
+                pipe.publish(INVALIDATION_CHANNEL, f'key:{key}')
+            await pipe.execute()
+        if self.local_cache is not None:
+            for key in keys:
+                self.local_cache.invalidate(key)
+
+    async def get_version_tag(self, *names: str) -> str:
+        """Получение строки из эпохи и текущих версий сущностей для построения ETag."""
+        keys = [VERSION_EPOCH_KEY, *(f'version:{name}' for name in names)]
+        epoch, *versions = await self.get_many(keys)
+        if epoch is None:
+            new_epoch = uuid.uuid4().hex[:8].encode()
+            await self.redis.set(VERSION_EPOCH_KEY, new_epoch, nx=True)
+            epoch, *versions = await self.get_many(keys)
+            if epoch is None:
+                # Redis очистили между SET NX и чтением; ETag с этой эпохой просто не совпадет со следующим.
+                epoch = new_epoch
+        return '-'.join([epoch.decode(), *(version.decode() if version else '0' for version in versions)])
+
+    async def bump_versions(self, *names: str) -> None:
+        """Увеличение версий сущностей, после чего выданные для них ETag перестают совпадать."""
+        keys = [f'version:{name}' for name in names]
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for key in keys:
+                pipe.incr(key)
+                pipe.publish(INVALIDATION_CHANNEL, f'key:{key}')
+            await pipe.execute()
+        if self.local_cache is not None:
+            for key in keys:
+                self.local_cache.invalidate(key)
+
+    async def set(self, key: str, value: str | bytes, expire: int | None = None) -> None:
+        """Установка значения по ключу в Redis с опциональным временем истечения.
+
+        Прежнее значение сбрасывается из кэша в памяти остальных воркеров.
+        """
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if expire is not None:
+                pipe.set(key, value, ex=expire)
+            else:
+                pipe.set(key, value)
+            pipe.publish(INVALIDATION_CHANNEL, f'key:{key}')
+            await pipe.execute()
+        if self.local_cache is not None:
+            self.local_cache.set(key, value, expire=expire)
+
+    async def set_if_absent(self, key: str, value: str | bytes, expire: float) -> bool:
+        """Установка значения в Redis, только если ключа еще нет; возвращает True, если значение установлено."""
+        return bool(await self.redis.set(key, value, nx=True, px=int(expire * 1000)))
+
+    async def hget(self, key: str, field: str) -> bytes | None:
+        """Получение значения поля хэша по ключу из памяти процесса или из Redis."""
+        if self.local_cache is not None:
+            value = self.local_cache.get(key, field)
+            if value is not None:
+                return value
+        value = await self.redis.hget(key, field)
+        if value is not None and self.local_cache is not None:
+            self.local_cache.set(key, value, field=field)
+        return value
+
+    async def hset(self, key: str, field: str, value: str | bytes, expire: int | None = None) -> None:
+        """Установка значения поля хэша по ключу в Redis, время истечения задается для всего хэша.
+
+        Прежние поля хэша сбрасываются из кэша в памяти остальных воркеров.
+        """
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, field, value)
+            if expire is not None:
+                pipe.expire(key, expire)
+            pipe.publish(INVALIDATION_CHANNEL, f'key:{key}')
+            await pipe.execute()
+        if self.local_cache is not None:
+            self.local_cache.set(key, value, field=field, expire=expire)
+
+    async def delete(self, *keys: str) -> None:
+        """Удаление значений по ключам из Redis и из кэша в памяти всех воркеров."""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.delete(key)
+                pipe.publish(INVALIDATION_CHANNEL, f'key:{key}')
+            await pipe.execute()
+        if self.local_cache is not None:
+            for key in keys:
+                self.local_cache.invalidate(key)
 
     async def delete_all(self) -> None:
         await self.redis.flushall()
+        await self._invalidate_local('all')
+
+    async def _invalidate_local(self, message: str) -> None:
+        """Сбрасывает кэш в памяти текущего процесса и рассылает сообщение остальным воркерам."""
+        if self.local_cache is not None:
+            self.local_cache.apply_invalidation(message)
+        await self.redis.publish(INVALIDATION_CHANNEL, message)
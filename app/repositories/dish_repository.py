@@ -6,7 +6,7 @@ from sqlalchemy import Row, delete, update
 from sqlalchemy.future import select
 
 from app.database import get_async_session
-from app.models import Dish
+from app.models import Dish, Menu, Submenu
 
 
 class DishRepository:
@@ -14,9 +14,33 @@ class DishRepository:
         """Инициализация репозитория блюда с сессией базы данных."""
         self.session = session
 
-    async def get_all_dishes_for_submenu(self, submenu_id: UUID) -> Sequence[Row]:
-        """Возвращает список всех блюд."""
-        query = (select(Dish).filter(Dish.submenu_id == submenu_id))
+    async def _change_dishes_count(self, submenu_id: UUID, delta: int) -> None:
+        """Изменяет количество блюд у подменю и его меню на delta."""
+        result = await self.session.execute(
+            update(Submenu)
+            .where(Submenu.id == submenu_id)
+            .values(dishes_count=Submenu.dishes_count + delta)
+            .returning(Submenu.menu_id)
+        )
+        await self.session.execute(
+            update(Menu)
+            .where(Menu.id == result.scalar())
+            .values(dishes_count=Menu.dishes_count + delta)
+        )
+
+    async def get_all_dishes_for_submenu(
+            self,
+            submenu_id: UUID,
+            limit: int,
+            after: UUID | None = None
+    ) -> Sequence[Row]:
+        """Возвращает страницу списка блюд, следующих по ID после after."""
+        query = (select(Dish)
+                 .filter(Dish.submenu_id == submenu_id)
+                 .order_by(Dish.id)
+                 .limit(limit))
+        if after is not None:
+            query = query.filter(Dish.id > after)
         result = await self.session.execute(query)
         return result.scalars().all()
 
@@ -30,6 +54,7 @@ class DishRepository:
         """Создает и возвращает новое блюдо."""
         new_dish = Dish(**dish_data)
         self.session.add(new_dish)
+        await self._change_dishes_count(dish_data['submenu_id'], 1)
         await self.session.commit()
         return new_dish
 
@@ -45,7 +70,9 @@ class DishRepository:
 
     async def delete_dish(self, dish_id: UUID) -> None:
         """Удаляет блюдо по его ID."""
-        result = await self.session.execute(delete(Dish).where(Dish.id == dish_id))
-        if result.rowcount == 0:
+        result = await self.session.execute(delete(Dish).where(Dish.id == dish_id).returning(Dish.submenu_id))
+        submenu_id = result.scalar()
+        if submenu_id is None:
             raise HTTPException(status_code=404, detail='dish not found')
+        await self._change_dishes_count(submenu_id, -1)
         await self.session.commit()
@@ -0,0 +1,102 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any
+
+from aioredis import Redis
+from aioredis.exceptions import ConnectionError
+
+INVALIDATION_CHANNEL = 'cache:invalidate'
+
+
+class LocalCache:
+    """Кэш в памяти процесса с TTL и вытеснением давно не использованных записей (LRU)."""
+
+    def __init__(self, max_bytes: int, ttl: float) -> None:
+        """Инициализация кэша с ограничением суммарного размера значений и временем жизни записей."""
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.entries: OrderedDict[tuple[str, str | None], tuple[float, Any, int]] = OrderedDict()
+        self.fields: dict[str, set[str | None]] = {}
+
+    def get(self, key: str, field: str | None = None) -> Any:
+        """Возвращает значение из памяти или None, если его нет или оно устарело."""
+        entry = self.entries.get((key, field))
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._remove((key, field))
+            self.misses += 1
+            return None
+        self.entries.move_to_end((key, field))
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any, field: str | None = None, expire: float | None = None) -> None:
+        """Сохраняет значение в памяти, вытесняя самые старые записи при превышении лимита."""
+        size = len(key) + len(field or '') + len(value)
+        if size > self.max_bytes:
+            return
+        if (key, field) in self.entries:
+            self._remove((key, field))
+        ttl = self.ttl if expire is None else min(self.ttl, expire)
+        self.entries[(key, field)] = (time.monotonic() + ttl, value, size)
+        self.fields.setdefault(key, set()).add(field)
+        self.size += size
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self.entries)))
+
+    def invalidate(self, key: str) -> None:
+        """Удаляет из памяти значение ключа вместе со всеми полями хэша."""
+        for field in self.fields.get(key, set()).copy():
+            self._remove((key, field))
+
+    def clear(self) -> None:
+        """Полностью очищает кэш в памяти."""
+        self.entries.clear()
+        self.fields.clear()
+        self.size = 0
+
+    def stats(self) -> dict[str, int]:
+        """Возвращает статистику попаданий и промахов."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self.entries),
+            'size': self.size,
+        }
+
+    def apply_invalidation(self, message: str) -> None:
+        """Применяет сообщение об инвалидации, полученное из канала Redis."""
+        kind, _, target = message.partition(':')
+        if kind == 'key':
+            self.invalidate(target)
+        else:
+            self.clear()
+
+    async def listen(self, redis: Redis) -> None:
+        """Слушает канал инвалидации Redis, чтобы изменения в любом воркере сбрасывали кэш в памяти."""
+        while True:
+            pubsub = redis.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Пока подписки не было, сообщения могли быть пропущены.
+                self.clear()
+                async for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        self.apply_invalidation(message['data'].decode())
+            except ConnectionError:
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.close()
+
+    def _remove(self, entry_key: tuple[str, str | None]) -> None:
+        _, _, size = self.entries.pop(entry_key)
+        self.size -= size
+        key, field = entry_key
+        fields = self.fields[key]
+        fields.discard(field)
+        if not fields:
+            del self.fields[key]
@@ -1,10 +1,11 @@
-from typing import Any, Sequence
+from typing import Any, AsyncIterator, Sequence
 from uuid import UUID
 
 from fastapi import Depends, HTTPException
-from sqlalchemy import delete, func, update
+from sqlalchemy import String, Text, cast, delete, func, literal_column, update
 from sqlalchemy.engine.row import Row
 from sqlalchemy.future import select
+from sqlalchemy.sql.expression import ColumnClause
 
 from app.database import get_async_session
 from app.models import Dish, Menu, Submenu
@@ -15,42 +16,49 @@ class MenuRepository:
         """Инициализация репозитория меню с сессией базы данных."""
         self.session = session
 
-    def _submenus_count_subquery(self) -> Any:
-        """Возвращает подзапрос для подсчета подменю."""
-        return (
-            select(func.count(Submenu.id))
-            .where(Submenu.menu_id == Menu.id)
-            .correlate(Menu)
+    def _full_menus_json_query(self) -> Any:
+        """Возвращает запрос, собирающий дерево меню -> подменю -> блюда в JSON на стороне Postgres."""
+        empty_json_array: ColumnClause[Any] = literal_column("'[]'::json")
+        dishes = (
+            select(func.coalesce(func.json_agg(func.json_build_object(
+                'title', Dish.title,
+                'description', Dish.description,
+                'price', cast(Dish.effective_price, String),
+                'id', Dish.id,
+            )), empty_json_array))
+            .where(Dish.submenu_id == Submenu.id)
+            .correlate(Submenu)
             .scalar_subquery()
-            .label('submenus_count')
         )
-
-    def _dishes_count_subquery(self) -> Any:
-        """Возвращает подзапрос для подсчета блюд."""
-        return (
-            select(func.count(Dish.id))
-            .join(Submenu, Submenu.id == Dish.submenu_id)
+        submenus = (
+            select(func.coalesce(func.json_agg(func.json_build_object(
+                'title', Submenu.title,
+                'description', Submenu.description,
+                'id', Submenu.id,
+                'dishes', dishes,
+            )), empty_json_array))
             .where(Submenu.menu_id == Menu.id)
             .correlate(Menu)
             .scalar_subquery()
-            .label('dishes_count')
         )
+        return select(cast(func.coalesce(func.json_agg(func.json_build_object(
+            'title', Menu.title,
+            'description', Menu.description,
+            'id', Menu.id,
+            'submenus', submenus,
+        )), empty_json_array), Text))
 
-    async def get_all_menus(self) -> Sequence[Row]:
-        """Возвращает список всех меню."""
-        query = select(Menu).add_columns(
-            self._submenus_count_subquery(),
-            self._dishes_count_subquery()
-        )
+    async def get_all_menus(self, limit: int, after: UUID | None = None) -> Sequence[Row]:
+        """Возвращает страницу списка меню, следующих по ID после after."""
+        query = select(Menu).add_columns(Menu.submenus_count, Menu.dishes_count).order_by(Menu.id).limit(limit)
+        if after is not None:
+            query = query.where(Menu.id > after)
         result = await self.session.execute(query)
         return result.all()
 
     async def get_menu_by_id(self, menu_id: UUID) -> Row:
         """Возвращает меню по его ID."""
-        query = select(Menu).add_columns(
-            self._submenus_count_subquery(),
-            self._dishes_count_subquery()
-        ).where(Menu.id == menu_id)
+        query = select(Menu).add_columns(Menu.submenus_count, Menu.dishes_count).where(Menu.id == menu_id)
         result = await self.session.execute(query)
         return result.first()
 
@@ -78,6 +86,26 @@ class MenuRepository:
             raise HTTPException(status_code=404, detail='menu not found')
         await self.session.commit()
 
+    async def refresh_counters(self) -> None:
+        """Пересчитывает количество подменю и блюд у всех подменю и меню без фиксации транзакции."""
+        await self.session.execute(
+            update(Submenu)
+            .values(dishes_count=select(func.count(Dish.id))
+                    .where(Dish.submenu_id == Submenu.id)
+                    .scalar_subquery())
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(
+            update(Menu)
+            .values(submenus_count=select(func.count(Submenu.id))
+                    .where(Submenu.menu_id == Menu.id)
+                    .scalar_subquery(),
+                    dishes_count=select(func.coalesce(func.sum(Submenu.dishes_count), 0))
+                    .where(Submenu.menu_id == Menu.id)
+                    .scalar_subquery())
+            .execution_options(synchronize_session=False)
+        )
+
     async def get_full_menus(self) -> Sequence[tuple[Menu, Submenu, Dish]]:
         query = (select(Menu, Submenu, Dish)
                  .join(Submenu, Submenu.menu_id == Menu.id, isouter=True)
@@ -85,3 +113,29 @@ class MenuRepository:
 
         result = await self.session.execute(query)
         return result.all()
+
+    async def get_full_menus_json(self) -> str:
+        """Возвращает готовый JSON всех меню с подменю и блюдами, цены блюд считаются с учетом скидок."""
+        result = await self.session.execute(self._full_menus_json_query())
+        return result.scalar_one()
+
+    async def stream_full_menus(self, batch_size: int = 1000) -> AsyncIterator[Row]:
+        """Построчно возвращает меню с подменю и блюдами через серверный курсор."""
+        query = (select(Menu.id.label('menu_id'),
+                        Menu.title.label('menu_title'),
+                        Menu.description.label('menu_description'),
+                        Submenu.id.label('submenu_id'),
+                        Submenu.title.label('submenu_title'),
+                        Submenu.description.label('submenu_description'),
+                        Dish.id.label('dish_id'),
+                        Dish.title.label('dish_title'),
+                        Dish.description.label('dish_description'),
+                        Dish.effective_price.label('dish_price'))
+                 .join(Submenu, Submenu.menu_id == Menu.id, isouter=True)
+                 .join(Dish, Dish.submenu_id == Submenu.id, isouter=True)
+                 .order_by(Menu.id, Submenu.id, Dish.id)
+                 .execution_options(yield_per=batch_size))
+
+        result = await self.session.stream(query)
+        async for row in result:
+            yield row
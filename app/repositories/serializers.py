@@ -0,0 +1,25 @@
+import json
+from typing import Any, Protocol
+
+import orjson
+
+
+class Serializer(Protocol):
+    """Преобразование значений кэша в байты."""
+
+    def dumps(self, value: Any) -> bytes:
+        ...
+
+
+class OrjsonSerializer:
+    """Сериализатор на orjson, используется по умолчанию."""
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value)
+
+
+class JsonSerializer:
+    """Сериализатор на стандартном модуле json."""
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False).encode()
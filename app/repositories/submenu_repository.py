@@ -2,11 +2,11 @@ from typing import Any, Sequence
 from uuid import UUID
 
 from fastapi import Depends, HTTPException
-from sqlalchemy import Row, delete, func, update
+from sqlalchemy import Row, delete, update
 from sqlalchemy.future import select
 
 from app.database import get_async_session
-from app.models import Dish, Submenu
+from app.models import Menu, Submenu
 
 
 class SubmenuRepository:
@@ -14,29 +14,20 @@ class SubmenuRepository:
         """Инициализация репозитория подменю с сессией базы данных."""
         self.session = session
 
-    def _dishes_count_subquery(self) -> Any:
-        """Возвращает подзапрос для подсчета блюд."""
-        return (
-            select(func.count(Dish.id))
-            .where(Dish.submenu_id == Submenu.id)
-            .correlate(Submenu)
-            .scalar_subquery()
-            .label('dishes_count')
-        )
-
-    async def get_all_submenus_for_menu(self, menu_id: UUID) -> Sequence[Row]:
-        """Возвращает список всех подменю."""
-        query = select(Submenu).add_columns(
-            self._dishes_count_subquery()
-        ).where(Submenu.menu_id == menu_id)
+    async def get_all_submenus_for_menu(self, menu_id: UUID, limit: int, after: UUID | None = None) -> Sequence[Row]:
+        """Возвращает страницу списка подменю, следующих по ID после after."""
+        query = (select(Submenu).add_columns(Submenu.dishes_count)
+                 .where(Submenu.menu_id == menu_id)
+                 .order_by(Submenu.id)
+                 .limit(limit))
+        if after is not None:
+            query = query.where(Submenu.id > after)
         result = await self.session.execute(query)
         return result.all()
 
     async def get_submenu_by_id(self, submenu_id: UUID) -> Row:
         """Возвращает подменю по его ID."""
-        query = select(Submenu).add_columns(
-            self._dishes_count_subquery()
-        ).where(Submenu.id == submenu_id)
+        query = select(Submenu).add_columns(Submenu.dishes_count).where(Submenu.id == submenu_id)
         result = await self.session.execute(query)
         return result.first()
 
@@ -44,6 +35,11 @@ class SubmenuRepository:
         """Создает и возвращает новое подменю."""
         new_submenu = Submenu(**submenu_data)
         self.session.add(new_submenu)
+        await self.session.execute(
+            update(Menu)
+            .where(Menu.id == new_submenu.menu_id)
+            .values(submenus_count=Menu.submenus_count + 1)
+        )
         await self.session.commit()
         return new_submenu
 
@@ -59,7 +55,18 @@ class SubmenuRepository:
 
     async def delete_submenu(self, submenu_id: UUID) -> None:
         """Удаляет подменю по его ID."""
-        result = await self.session.execute(delete(Submenu).where(Submenu.id == submenu_id))
-        if result.rowcount == 0:
+        result = await self.session.execute(
+            delete(Submenu)
+            .where(Submenu.id == submenu_id)
+            .returning(Submenu.menu_id, Submenu.dishes_count)
+        )
+        deleted_submenu = result.first()
+        if deleted_submenu is None:
             raise HTTPException(status_code=404, detail='submenu not found')
+        await self.session.execute(
+            update(Menu)
+            .where(Menu.id == deleted_submenu.menu_id)
+            .values(submenus_count=Menu.submenus_count - 1,
+                    dishes_count=Menu.dishes_count - deleted_submenu.dishes_count)
+        )
         await self.session.commit()
@@ -0,0 +1,50 @@
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from app.config import ADMIN_TOKEN
+from app.database import get_redis_connection
+from app.repositories.cache_repository import CacheRepository
+from app.services.admin_service import AdminService
+
+router = APIRouter(
+    prefix='/api/v1/admin',
+    tags=['Admin'],
+)
+
+bearer = HTTPBearer(auto_error=False)
+
+
+def verify_admin_token(credentials: HTTPAuthorizationCredentials | None = Depends(bearer)) -> None:
+    """Проверяет токен администратора из заголовка Authorization: Bearer."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=503, detail='admin api is disabled')
+    if credentials is None or not secrets.compare_digest(credentials.credentials.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(
+            status_code=401,
+            detail='invalid admin token',
+            headers={'WWW-Authenticate': 'Bearer'},
+        )
+
+
+def get_admin_service(redis=Depends(get_redis_connection)) -> AdminService:
+    """Предоставляет сервис администрирования."""
+    return AdminService(cache_repository=CacheRepository(redis))
+
+
+@router.post(
+    '/sync',
+    summary='Запустить синхронизацию меню',
+    status_code=202,
+    dependencies=[Depends(verify_admin_token)],
+    responses={
+        202: {'description': 'Синхронизация поставлена в очередь или уже запланирована'},
+        401: {'description': 'Неверный токен администратора'},
+        503: {'description': 'Токен администратора не настроен'},
+    },
+)
+async def trigger_sync(admin_service: AdminService = Depends(get_admin_service)) -> dict:
+    """Ставит в очередь немедленную инкрементальную синхронизацию меню, повторные запросы в окне объединяются."""
+    scheduled = await admin_service.trigger_sync()
+    return {'status': 'scheduled' if scheduled else 'already scheduled'}
@@ -1,13 +1,15 @@
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_async_session, get_redis_connection
+from app.config import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
+from app.database import get_async_session, get_local_cache, get_redis_connection
 from app.repositories.cache_repository import CacheRepository
 from app.repositories.dish_repository import DishRepository
 from app.schemas import CreateEditDishModel, DishModel
 from app.services.dish_service import DishDict, DishService
+from app.services.versions import etag_matches, get_etag, menu_version, submenu_version
 
 router = APIRouter(
     prefix='/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes',
@@ -17,10 +19,11 @@ router = APIRouter(
 
 def get_dish_service(
         session: AsyncSession = Depends(get_async_session),
-        redis=Depends(get_redis_connection)) -> DishService:
+        redis=Depends(get_redis_connection),
+        local_cache=Depends(get_local_cache)) -> DishService:
     """Предоставляет сервис для работы с блюдо."""
     menu_repository = DishRepository(session=session)
-    cache_repository = CacheRepository(redis=redis)
+    cache_repository = CacheRepository(redis=redis, local_cache=local_cache)
     return DishService(dish_repository=menu_repository, cache_repository=cache_repository)
 
 
@@ -34,22 +37,31 @@ def convert_dish(dish: DishDict) -> DishModel:
     response_model=list[DishModel],
     summary='Получить список блюд',
     responses={
-        200: {'description': 'Список блюд успешно получен'}
+        200: {'description': 'Список блюд успешно получен'},
+        304: {'description': 'Данные не изменились'},
     }
 )
 async def get_dishes(
         menu_id: UUID,
         submenu_id: UUID,
+        limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+        after: UUID | None = None,
+        if_none_match: str | None = Header(None),
         dish_service: DishService = Depends(get_dish_service)
-) -> list[DishModel]:
+) -> Response:
     """
-    Возвращает список всех блюд в подменю.
+    Возвращает страницу списка блюд в подменю, упорядоченного по ID.
 
     - **menu_id**: UUID родительского меню.
     - **submenu_id**: UUID родительского подменю.
+    - **limit**: максимальное количество блюд на странице.
+    - **after**: UUID последнего блюда предыдущей страницы.
     """
-    dishes = await dish_service.get_dishes(menu_id, submenu_id)
-    return [convert_dish(dish) for dish in dishes]
+    etag = await get_etag(dish_service.cache_repository, menu_version(menu_id), submenu_version(submenu_id))
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    dishes_json = await dish_service.get_dishes(menu_id, submenu_id, limit, after)
+    return Response(content=dishes_json, media_type='application/json', headers={'ETag': etag})
 
 
 @router.get(
@@ -59,6 +71,7 @@ async def get_dishes(
     summary='Получить детали блюда',
     responses={
         200: {'description': 'Успешное получение деталей блюда'},
+        304: {'description': 'Данные не изменились'},
         404: {
             'description': 'Блюдо не найдено',
             'content': {
@@ -73,8 +86,9 @@ async def get_dish(
         menu_id: UUID,
         submenu_id: UUID,
         dish_id: UUID,
+        if_none_match: str | None = Header(None),
         dish_service: DishService = Depends(get_dish_service)
-) -> DishModel:
+) -> Response:
     """
     Возвращает детали блюда по его идентификатору.
 
@@ -82,8 +96,11 @@ async def get_dish(
     - **submenu_id**: UUID родительского подменю.
     - **dish_id**: UUID блюда для получения информации.
     """
-    dish = await dish_service.get_dish(menu_id, submenu_id, dish_id)
-    return convert_dish(dish)
+    etag = await get_etag(dish_service.cache_repository, menu_version(menu_id), submenu_version(submenu_id))
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    dish_json = await dish_service.get_dish(menu_id, submenu_id, dish_id)
+    return Response(content=dish_json, media_type='application/json', headers={'ETag': etag})
 
 
 @router.post(
@@ -1,11 +1,20 @@
-from fastapi import APIRouter, Depends
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, Header, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_async_session, get_redis_connection
+from app.database import (
+    async_session_maker,
+    get_async_session,
+    get_local_cache,
+    get_redis_connection,
+)
 from app.repositories.cache_repository import CacheRepository
 from app.repositories.menu_repository import MenuRepository
 from app.schemas import FullMenuModel
 from app.services.full_menu_service import FullMenuService
+from app.services.versions import CATALOG_VERSION, etag_matches, get_etag
 
 router = APIRouter(
     prefix='/api/v1/full_menu',
@@ -15,11 +24,12 @@ router = APIRouter(
 
 def get_full_menu_service(
         session: AsyncSession = Depends(get_async_session),
-        redis=Depends(get_redis_connection)
+        redis=Depends(get_redis_connection),
+        local_cache=Depends(get_local_cache)
 ) -> FullMenuService:
     """Предоставляет сервис для работы с меню."""
     menu_repository = MenuRepository(session=session)
-    cache_repository = CacheRepository(redis)
+    cache_repository = CacheRepository(redis, local_cache)
     return FullMenuService(menu_repository=menu_repository, cache_repository=cache_repository)
 
 
@@ -29,11 +39,52 @@ def get_full_menu_service(
     response_description='Список всех меню',
     response_model=list[FullMenuModel],
     responses={
-        200: {'description': 'Список меню успешно получен'}
+        200: {'description': 'Список меню успешно получен'},
+        304: {'description': 'Данные не изменились'},
     },
 )
-async def get_full_menus(full_menu_service: FullMenuService = Depends(get_full_menu_service)) -> list[FullMenuModel]:
+async def get_full_menus(
+        if_none_match: str | None = Header(None),
+        full_menu_service: FullMenuService = Depends(get_full_menu_service)
+) -> Response:
     """Возвращает список всех доступных меню в системе."""
     """Со связанными подменю и блюдами"""
+    etag = await get_etag(full_menu_service.cache_repository, CATALOG_VERSION)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={'ETag': etag})
     result = await full_menu_service.get_full_menus()
-    return result
+    return Response(content=result, media_type='application/json', headers={'ETag': etag})
+
+
+@router.get(
+    '/stream',
+    summary='Получить список меню со всеми связанными подменю и блюдами потоком',
+    response_description='Список всех меню',
+    response_model=list[FullMenuModel],
+    responses={
+        200: {'description': 'Список меню успешно получен'},
+        304: {'description': 'Данные не изменились'},
+    },
+)
+async def stream_full_menus(
+        if_none_match: str | None = Header(None),
+        redis=Depends(get_redis_connection),
+        local_cache=Depends(get_local_cache)
+) -> Response:
+    """Возвращает список всех меню частями по мере чтения из базы данных."""
+    """Сессия открывается внутри генератора, так как живет дольше обработчика запроса"""
+    cache_repository = CacheRepository(redis, local_cache)
+    etag = await get_etag(cache_repository, CATALOG_VERSION)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={'ETag': etag})
+
+    async def content() -> AsyncIterator[bytes]:
+        async with async_session_maker() as session:
+            full_menu_service = FullMenuService(
+                menu_repository=MenuRepository(session=session),
+                cache_repository=cache_repository
+            )
+            async for chunk in full_menu_service.stream_full_menus():
+                yield chunk
+
+    return StreamingResponse(content(), media_type='application/json', headers={'ETag': etag})
@@ -1,13 +1,15 @@
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_async_session, get_redis_connection
+from app.config import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
+from app.database import get_async_session, get_local_cache, get_redis_connection
 from app.repositories.cache_repository import CacheRepository
 from app.repositories.menu_repository import MenuRepository
 from app.schemas import CreateEditMenuModel, MenuModel
 from app.services.menu_service import MenuDict, MenuService
+from app.services.versions import CATALOG_VERSION, etag_matches, get_etag, menu_version
 
 router = APIRouter(
     prefix='/api/v1/menus',
@@ -17,11 +19,12 @@ router = APIRouter(
 
 def get_menu_service(
         session: AsyncSession = Depends(get_async_session),
-        redis=Depends(get_redis_connection)
+        redis=Depends(get_redis_connection),
+        local_cache=Depends(get_local_cache)
 ) -> MenuService:
     """Предоставляет сервис для работы с меню."""
     menu_repository = MenuRepository(session=session)
-    cache_repository = CacheRepository(redis=redis)
+    cache_repository = CacheRepository(redis=redis, local_cache=local_cache)
     return MenuService(menu_repository=menu_repository, cache_repository=cache_repository)
 
 
@@ -35,13 +38,27 @@ def convert_menu(menu: MenuDict) -> MenuModel:
     response_description='Список всех меню',
     response_model=list[MenuModel],
     responses={
-        200: {'description': 'Список меню успешно получен'}
+        200: {'description': 'Список меню успешно получен'},
+        304: {'description': 'Данные не изменились'},
     },
 )
-async def get_menus(menu_service: MenuService = Depends(get_menu_service)) -> list[MenuModel]:
-    """Возвращает список всех доступных меню в системе."""
-    menus = await menu_service.get_menus()
-    return [convert_menu(it) for it in menus]
+async def get_menus(
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    after: UUID | None = None,
+    if_none_match: str | None = Header(None),
+    menu_service: MenuService = Depends(get_menu_service)
+) -> Response:
+    """
+    Возвращает страницу списка доступных меню в системе, упорядоченного по ID.
+
+    - **limit**: максимальное количество меню на странице.
+    - **after**: UUID последнего меню предыдущей страницы.
+    """
+    etag = await get_etag(menu_service.cache_repository, CATALOG_VERSION)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    menus_json = await menu_service.get_menus(limit, after)
+    return Response(content=menus_json, media_type='application/json', headers={'ETag': etag})
 
 
 @router.get(
@@ -51,6 +68,7 @@ async def get_menus(menu_service: MenuService = Depends(get_menu_service)) -> li
     response_model=MenuModel,
     responses={
         200: {'description': 'Успешное получение деталей меню'},
+        304: {'description': 'Данные не изменились'},
         404: {
             'description': 'Меню не найдено',
             'content': {
@@ -63,16 +81,20 @@ async def get_menus(menu_service: MenuService = Depends(get_menu_service)) -> li
 )
 async def get_menu(
     menu_id: UUID,
+    if_none_match: str | None = Header(None),
     menu_service: MenuService = Depends(get_menu_service)
-) -> MenuModel:
+) -> Response:
     """
     Возвращает детали меню по его уникальному идентификатору.
 
     - **menu_id**: UUID меню для получения информации.
     """
 
-    menu = await menu_service.get_menu(menu_id)
-    return convert_menu(menu)
+    etag = await get_etag(menu_service.cache_repository, menu_version(menu_id))
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    menu_json = await menu_service.get_menu(menu_id)
+    return Response(content=menu_json, media_type='application/json', headers={'ETag': etag})
 
 
 @router.post(
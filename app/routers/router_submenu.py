@@ -1,13 +1,15 @@
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_async_session, get_redis_connection
+from app.config import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
+from app.database import get_async_session, get_local_cache, get_redis_connection
 from app.repositories.cache_repository import CacheRepository
 from app.repositories.submenu_repository import SubmenuRepository
 from app.schemas import CreateEditSubmenuModel, SubmenuModel
 from app.services.submenu_service import SubmenuDict, SubmenuService
+from app.services.versions import etag_matches, get_etag, menu_version, submenu_version
 
 router = APIRouter(
     prefix='/api/v1/menus/{menu_id}/submenus',
@@ -17,11 +19,12 @@ router = APIRouter(
 
 def get_submenu_service(
         session: AsyncSession = Depends(get_async_session),
-        redis=Depends(get_redis_connection)
+        redis=Depends(get_redis_connection),
+        local_cache=Depends(get_local_cache)
 ) -> SubmenuService:
     """Предоставляет сервис для работы с подменю."""
     menu_repository = SubmenuRepository(session=session)
-    cache_repository = CacheRepository(redis=redis)
+    cache_repository = CacheRepository(redis=redis, local_cache=local_cache)
     return SubmenuService(submenu_repository=menu_repository, cache_repository=cache_repository)
 
 
@@ -35,20 +38,29 @@ def convert_submenu(submenu: SubmenuDict) -> SubmenuModel:
     response_model=list[SubmenuModel],
     summary='Получить список подменю',
     responses={
-        200: {'description': 'Список подменю успешно получен'}
+        200: {'description': 'Список подменю успешно получен'},
+        304: {'description': 'Данные не изменились'},
     },
 )
 async def get_submenus(
         menu_id: UUID,
+        limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+        after: UUID | None = None,
+        if_none_match: str | None = Header(None),
         submenu_service: SubmenuService = Depends(get_submenu_service)
-) -> list[SubmenuModel]:
+) -> Response:
     """
-    Возвращает список подменю для указанного меню.
+    Возвращает страницу списка подменю для указанного меню, упорядоченного по ID.
 
     - **menu_id**: UUID родительского меню.
+    - **limit**: максимальное количество подменю на странице.
+    - **after**: UUID последнего подменю предыдущей страницы.
     """
-    submenus = await submenu_service.get_submenus(menu_id)
-    return [convert_submenu(it) for it in submenus]
+    etag = await get_etag(submenu_service.cache_repository, menu_version(menu_id))
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    submenus_json = await submenu_service.get_submenus(menu_id, limit, after)
+    return Response(content=submenus_json, media_type='application/json', headers={'ETag': etag})
 
 
 @router.get(
@@ -58,6 +70,7 @@ async def get_submenus(
     summary='Получить детали подменю',
     responses={
         200: {'description': 'Успешное получение деталей подменю'},
+        304: {'description': 'Данные не изменились'},
         404: {
             'description': 'Подменю не найдено',
             'content': {
@@ -70,16 +83,20 @@ async def get_submenus(
 )
 async def get_submenu(
         menu_id: UUID, submenu_id: UUID,
+        if_none_match: str | None = Header(None),
         submenu_service: SubmenuService = Depends(get_submenu_service)
-) -> SubmenuModel:
+) -> Response:
     """
     Возвращает детали подменю по его идентификатору.
 
     - **menu_id**: UUID родительского меню.
     - **submenu_id**: UUID подменю для получения информации.
     """
-    submenu = await submenu_service.get_submenu(menu_id, submenu_id)
-    return convert_submenu(submenu)
+    etag = await get_etag(submenu_service.cache_repository, menu_version(menu_id), submenu_version(submenu_id))
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    submenu_json = await submenu_service.get_submenu(menu_id, submenu_id)
+    return Response(content=submenu_json, media_type='application/json', headers={'ETag': etag})
 
 
 @router.post(
@@ -1,6 +1,8 @@
 import uuid
+from functools import lru_cache
+from typing import Any
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 
 class CreateEditMenuModel(BaseModel):
@@ -42,3 +44,14 @@ class FullSubmenuModel(CreateEditSubmenuModel):
 class FullMenuModel(CreateEditMenuModel):
     id: uuid.UUID
     submenus: list[FullSubmenuModel]
+
+
+@lru_cache
+def _type_adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def to_jsonable(schema: Any, value: Any) -> Any:
+    """Проверяет значение по схеме ответа и возвращает его в виде, готовом к сериализации в JSON."""
+    adapter = _type_adapter(schema)
+    return adapter.dump_python(adapter.validate_python(value, from_attributes=True), mode='json')
@@ -0,0 +1,34 @@
+import asyncio
+
+from app.config import SYNC_DEBOUNCE
+from app.repositories.cache_repository import CacheRepository
+from background.celery_app import SYNC_TASK, celery_app
+
+# Метка запланированного запуска синхронизации: живет одно окно антидребезга.
+SYNC_TRIGGER_KEY = 'sync:trigger'
+
+
+class AdminService:
+    def __init__(self, cache_repository: CacheRepository) -> None:
+        """Инициализация сервиса администрирования."""
+        self.cache_repository = cache_repository
+
+    async def trigger_sync(self) -> bool:
+        """Ставит синхронизацию меню в очередь с задержкой на окно антидребезга.
+
+        Возвращает False, если запуск уже запланирован: он подхватит и эти изменения.
+        """
+        if not await self.cache_repository.set_if_absent(SYNC_TRIGGER_KEY, '1', expire=SYNC_DEBOUNCE):
+            return False
+        try:
+            await asyncio.to_thread(
+                celery_app.send_task,
+                SYNC_TASK,
+                kwargs={'triggered': True},
+                countdown=SYNC_DEBOUNCE
+            )
+        except Exception:
+            # Запуск не поставлен в очередь, следующий запрос должен попробовать снова.
+            await self.cache_repository.delete(SYNC_TRIGGER_KEY)
+            raise
+        return True
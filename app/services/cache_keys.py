@@ -0,0 +1,24 @@
+from uuid import UUID
+
+from app.repositories.cache_repository import CacheRepository
+
+
+async def menu_key(cache: CacheRepository, menu_id: UUID | str) -> str:
+    """Возвращает ключ меню с текущим поколением его кэша."""
+    menu_generation, = await cache.get_generations(f'menu:{menu_id}')
+    return f'menu:{menu_id}#{menu_generation}'
+
+
+async def menu_keys(cache: CacheRepository, menu_ids: list[UUID]) -> list[str]:
+    """Возвращает ключи нескольких меню, читая поколения одним запросом."""
+    menu_generations = await cache.get_generations(*(f'menu:{menu_id}' for menu_id in menu_ids))
+    return [f'menu:{menu_id}#{generation}' for menu_id, generation in zip(menu_ids, menu_generations)]
+
+
+async def submenu_key(cache: CacheRepository, menu_id: UUID | str, submenu_id: UUID | str) -> str:
+    """Возвращает ключ подменю с текущими поколениями кэша его меню и самого подменю."""
+    menu_generation, submenu_generation = await cache.get_generations(
+        f'menu:{menu_id}',
+        f'submenu:{submenu_id}'
+    )
+    return f'menu:{menu_id}#{menu_generation}/submenu:{submenu_id}#{submenu_generation}'
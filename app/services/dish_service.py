@@ -1,11 +1,20 @@
-import json
+import math
+from functools import partial
 from typing import Any, TypedDict
 from uuid import UUID
 
 from fastapi import BackgroundTasks, HTTPException
 
+from app.config import CACHE_TTL_DISH
+from app.database import in_new_session
 from app.repositories.cache_repository import CacheRepository
 from app.repositories.dish_repository import DishRepository
+from app.schemas import DishModel, to_jsonable
+from app.services.cache_keys import menu_key, submenu_key
+from app.services.versions import bump_catalog_versions
+
+# Цена должна помещаться в столбец NUMERIC(10, 2): восемь знаков до запятой.
+MAX_PRICE = 10 ** 8
 
 
 class DishDict(TypedDict):
@@ -21,7 +30,7 @@ async def invalidate_dish(
         submenu_id: str,
         dish_id: str,
 ) -> None:
-    await cache.delete(f'menu:{menu_id}/submenu:{submenu_id}/dish:{dish_id}')
+    await cache.delete(f'{await submenu_key(cache, menu_id, submenu_id)}/dish:{dish_id}')
 
 
 async def invalidate_dish_all(
@@ -29,7 +38,8 @@ async def invalidate_dish_all(
         menu_id: str,
         submenu_id: str,
 ) -> None:
-    await cache.delete(f'menu:{menu_id}/submenu:{submenu_id}/dishes:all')
+    await cache.delete(f'{await submenu_key(cache, menu_id, submenu_id)}/dishes:all')
+    await cache.delete('full_menu')
 
 
 async def invalidate_dishes_submenu_submenus_menu_menus(
@@ -37,20 +47,39 @@ async def invalidate_dishes_submenu_submenus_menu_menus(
         menu_id: str,
         submenu_id: str
 ) -> None:
-    await cache.delete(f'menu:{menu_id}/submenu:{submenu_id}/dishes:all')
-    await cache.delete(f'menu:{menu_id}/submenu:{submenu_id}')
-    await cache.delete(f'menu:{menu_id}/submenus:all')
-    await cache.delete(f'menu:{menu_id}')
+    submenu_cache_key = await submenu_key(cache, menu_id, submenu_id)
+    menu_cache_key = await menu_key(cache, menu_id)
+    await cache.delete(f'{submenu_cache_key}/dishes:all')
+    await cache.delete(submenu_cache_key)
+    await cache.delete(f'{menu_cache_key}/submenus:all')
+    await cache.delete(menu_cache_key)
     await cache.delete('menus:all')
+    await cache.delete('full_menu')
 
 
-def validate_price(price: str) -> str:
-    """Проверяет корректность полученной цены блюда и возвращает корректный результат."""
+def parse_price(price: str) -> str:
+    """Разбирает цену блюда и возвращает ее с двумя знаками после запятой.
+
+    Цена, которая не число, не конечна или не помещается в NUMERIC(10, 2), дает ValueError.
+    """
     try:
         price_float = float(price)
     except ValueError:
-        raise HTTPException(status_code=400, detail='price type is not correct')
-    return normalize_price(price_float)
+        raise ValueError('price type is not correct')
+    if not math.isfinite(price_float):
+        raise ValueError('price type is not correct')
+    normalized_price = normalize_price(price_float)
+    if abs(float(normalized_price)) >= MAX_PRICE:
+        raise ValueError('price is out of range')
+    return normalized_price
+
+
+def validate_price(price: str) -> str:
+    """Проверяет корректность полученной цены блюда и возвращает корректный результат."""
+    try:
+        return parse_price(price)
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
 
 
 def normalize_price(price: float) -> str:
@@ -58,20 +87,16 @@ def normalize_price(price: float) -> str:
 
 
 def try_parse_discount(discount: str | None) -> float:
+    """Разбирает скидку в процентах, некорректные значения дают 0, остальные ограничиваются диапазоном 0-100."""
     if not discount:
         return 0
     try:
-        return float(discount)
+        discount_float = float(discount)
     except ValueError:
         return 0
-
-
-def calculate_price(price: str, discount: str | None) -> str:
-    price_float = float(price)
-    discount_float = try_parse_discount(discount)
-    return normalize_price(
-        max(0.0, (100.0 - discount_float) / 100.0 * price_float)
-    )
+    if not math.isfinite(discount_float):
+        return 0
+    return min(max(discount_float, 0), 100)
 
 
 class DishService:
@@ -87,56 +112,71 @@ class DishService:
     async def get_dishes(
             self,
             menu_id: UUID,
-            submenu_id: UUID
-    ) -> list[DishDict]:
-        """Возвращает список всех блюд с кэшированием."""
-        cache_key = f'menu:{menu_id}/submenu:{submenu_id}/dishes:all'
-        cached_dishes = await self.cache_repository.get(cache_key)
-
-        if cached_dishes:
-            return json.loads(cached_dishes)
-
-        dishes_data = await self.dish_repository.get_all_dishes_for_submenu(submenu_id)
-        dishes_list: list[DishDict] = []
-        for dish in dishes_data:
-            dish_discount = await self.cache_repository.get(f'{str(dish.id)}_discount')
-            dishes_list.append(
-                {
-                    'id': str(dish.id),
-                    'title': dish.title,
-                    'description': dish.description,
-                    'price': calculate_price(dish.price, dish_discount),
-                }
-            )
-        await self.cache_repository.set(cache_key, json.dumps(dishes_list), expire=60)
-        return dishes_list
+            submenu_id: UUID,
+            limit: int,
+            after: UUID | None = None
+    ) -> bytes:
+        """Возвращает страницу списка блюд в виде готового JSON с кэшированием."""
+        cache_key = f'{await submenu_key(self.cache_repository, menu_id, submenu_id)}/dishes:all'
+        page_key = f'{after}:{limit}'
+        load = partial(self._load_dishes, submenu_id=submenu_id, limit=limit, after=after)
+        return await self.cache_repository.get_or_fill(
+            cache_key,
+            lambda: load(self.dish_repository),
+            field=page_key,
+            ttl=CACHE_TTL_DISH,
+            refresh=in_new_session(DishRepository, load)
+        )
+
+    async def _load_dishes(
+            self,
+            dish_repository: DishRepository,
+            submenu_id: UUID,
+            limit: int,
+            after: UUID | None
+    ) -> bytes:
+        """Строит JSON из базы данных для заполнения кэша."""
+        dishes_data = await dish_repository.get_all_dishes_for_submenu(submenu_id, limit, after)
+        dishes_list: list[DishDict] = [
+            {
+                'id': str(dish.id),
+                'title': dish.title,
+                'description': dish.description,
+                'price': str(dish.effective_price),
+            }
+            for dish in dishes_data
+        ]
+        return self.cache_repository.serializer.dumps(to_jsonable(list[DishModel], dishes_list))
 
     async def get_dish(
             self,
             menu_id: UUID,
             submenu_id: UUID,
             dish_id: UUID
-    ) -> DishDict:
-        """Возвращает детали блюда по ID с кэшированием."""
-        cache_key = f'menu:{menu_id}/submenu:{submenu_id}/dish:{dish_id}'
-        cached_dish = await self.cache_repository.get(cache_key)
-
-        if cached_dish:
-            return json.loads(cached_dish)
+    ) -> bytes:
+        """Возвращает детали блюда по ID в виде готового JSON с кэшированием."""
+        cache_key = f'{await submenu_key(self.cache_repository, menu_id, submenu_id)}/dish:{dish_id}'
+        load = partial(self._load_dish, dish_id=dish_id)
+        return await self.cache_repository.get_or_fill(
+            cache_key,
+            lambda: load(self.dish_repository),
+            ttl=CACHE_TTL_DISH,
+            refresh=in_new_session(DishRepository, load)
+        )
 
-        dish_data = await self.dish_repository.get_dish_by_id(dish_id)
+    async def _load_dish(self, dish_repository: DishRepository, dish_id: UUID) -> bytes:
+        """Строит JSON из базы данных для заполнения кэша."""
+        dish_data = await dish_repository.get_dish_by_id(dish_id)
         if dish_data is None:
             raise HTTPException(status_code=404, detail='dish not found')
 
-        dish_discount = await self.cache_repository.get(f'{str(dish_id)}_discount')
         dish: DishDict = {
             'id': str(dish_data.id),
             'title': dish_data.title,
             'description': dish_data.description,
-            'price': calculate_price(dish_data.price, dish_discount),
+            'price': str(dish_data.effective_price),
         }
-        await self.cache_repository.set(cache_key, json.dumps(dish), expire=60)
-        return dish
+        return self.cache_repository.serializer.dumps(to_jsonable(DishModel, dish))
 
     async def create_dish(
             self,
@@ -154,10 +194,11 @@ class DishService:
             'description': new_dish.description,
             'price': new_dish.price
         }
-        await self.cache_repository.set(
-            f'menu:{menu_id}/submenu:{submenu_id}/dish:{str(new_dish.id)}',
-            json.dumps(dish_cache_data),
-            expire=60)
+        await self.cache_repository.store_object(
+            f'{await submenu_key(self.cache_repository, menu_id, submenu_id)}/dish:{str(new_dish.id)}',
+            to_jsonable(DishModel, dish_cache_data),
+            ttl=CACHE_TTL_DISH
+        )
 
         background_tasks.add_task(
             invalidate_dishes_submenu_submenus_menu_menus,
@@ -165,6 +206,12 @@ class DishService:
             str(menu_id),
             str(submenu_id)
         )
+        background_tasks.add_task(
+            bump_catalog_versions,
+            self.cache_repository,
+            str(menu_id),
+            str(submenu_id)
+        )
 
         return new_dish
 
@@ -182,17 +229,17 @@ class DishService:
         if updated_dish is None:
             raise HTTPException(status_code=404, detail='dish not found')
 
-        dish_discount = await self.cache_repository.get(f'{str(dish_id)}_discount')
         new_dish_data: DishDict = {
             'id': str(updated_dish.id),
             'title': updated_dish.title,
             'description': updated_dish.description,
-            'price': calculate_price(updated_dish.price, dish_discount)
+            'price': str(updated_dish.effective_price)
         }
-        await self.cache_repository.set(
-            f'menu:{menu_id}/submenu:{submenu_id}/dish:{dish_id}',
-            json.dumps(new_dish_data),
-            expire=60)
+        await self.cache_repository.store_object(
+            f'{await submenu_key(self.cache_repository, menu_id, submenu_id)}/dish:{dish_id}',
+            to_jsonable(DishModel, new_dish_data),
+            ttl=CACHE_TTL_DISH
+        )
 
         background_tasks.add_task(
             invalidate_dish_all,
@@ -200,6 +247,12 @@ class DishService:
             str(menu_id),
             str(submenu_id)
         )
+        background_tasks.add_task(
+            bump_catalog_versions,
+            self.cache_repository,
+            str(menu_id),
+            str(submenu_id)
+        )
 
         return new_dish_data
 
@@ -225,3 +278,9 @@ class DishService:
             str(menu_id),
             str(submenu_id)
         )
+        background_tasks.add_task(
+            bump_catalog_versions,
+            self.cache_repository,
+            str(menu_id),
+            str(submenu_id)
+        )
@@ -1,16 +1,16 @@
-from typing import Sequence
+from typing import Any, AsyncIterator, Sequence
 
+import orjson
+
+from app.config import CACHE_TTL_FULL_MENU
+from app.database import in_new_session
 from app.models import Dish, Menu, Submenu
 from app.repositories.cache_repository import CacheRepository
 from app.repositories.menu_repository import MenuRepository
 from app.schemas import DishModel, FullMenuModel, FullSubmenuModel
-from app.services.dish_service import calculate_price
 
 
-async def convert_full_data(
-        cache_repository: CacheRepository,
-        raw_results: Sequence[tuple[Menu, Submenu, Dish]]
-) -> list[FullMenuModel]:
+def convert_full_data(raw_results: Sequence[tuple[Menu, Submenu, Dish]]) -> list[FullMenuModel]:
     menus = {}
     submenus = {}
 
@@ -36,12 +36,11 @@ async def convert_full_data(
             submenu = submenus[submenu_data.id]
 
             if dish_data:
-                dish_discount = await cache_repository.get(f'{str(dish_data.id)}_discount')
                 dish_model = DishModel(
                     id=dish_data.id,
                     title=dish_data.title,
                     description=dish_data.description,
-                    price=calculate_price(dish_data.price, dish_discount)
+                    price=str(dish_data.effective_price)
                 )
                 submenu.dishes.append(dish_model)
 
@@ -54,6 +53,54 @@ class FullMenuService:
         self.menu_repository = menu_repository
         self.cache_repository = cache_repository
 
-    async def get_full_menus(self) -> list[FullMenuModel]:
-        results = await self.menu_repository.get_full_menus()
-        return await convert_full_data(self.cache_repository, results)
+    async def stream_full_menus(self) -> AsyncIterator[bytes]:
+        """Возвращает JSON-массив всех меню по частям, по одному меню за раз."""
+        yield b'['
+        menu: dict[str, Any] | None = None
+        is_first = True
+        async for row in self.menu_repository.stream_full_menus():
+            if menu is None or menu['id'] != str(row.menu_id):
+                if menu is not None:
+                    yield (b'' if is_first else b',') + orjson.dumps(menu)
+                    is_first = False
+                menu = {
+                    'id': str(row.menu_id),
+                    'title': row.menu_title,
+                    'description': row.menu_description,
+                    'submenus': [],
+                }
+
+            if row.submenu_id is None:
+                continue
+            if not menu['submenus'] or menu['submenus'][-1]['id'] != str(row.submenu_id):
+                menu['submenus'].append({
+                    'id': str(row.submenu_id),
+                    'title': row.submenu_title,
+                    'description': row.submenu_description,
+                    'dishes': [],
+                })
+
+            if row.dish_id is not None:
+                menu['submenus'][-1]['dishes'].append({
+                    'id': str(row.dish_id),
+                    'title': row.dish_title,
+                    'description': row.dish_description,
+                    'price': str(row.dish_price),
+                })
+
+        if menu is not None:
+            yield (b'' if is_first else b',') + orjson.dumps(menu)
+        yield b']'
+
+    async def get_full_menus(self) -> bytes:
+        """Возвращает готовый JSON всех меню с подменю и блюдами с кэшированием."""
+        return await self.cache_repository.get_or_fill(
+            'full_menu',
+            lambda: self._load_full_menus(self.menu_repository),
+            ttl=CACHE_TTL_FULL_MENU,
+            refresh=in_new_session(MenuRepository, self._load_full_menus)
+        )
+
+    async def _load_full_menus(self, menu_repository: MenuRepository) -> bytes:
+        """Строит JSON из базы данных для заполнения кэша."""
+        return (await menu_repository.get_full_menus_json()).encode()
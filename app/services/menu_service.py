@@ -1,11 +1,16 @@
-import json
+from functools import partial
 from typing import Any, TypedDict
 from uuid import UUID
 
 from fastapi import BackgroundTasks, HTTPException
 
+from app.config import CACHE_TTL_MENU
+from app.database import in_new_session
 from app.repositories.cache_repository import CacheRepository
 from app.repositories.menu_repository import MenuRepository
+from app.schemas import MenuModel, to_jsonable
+from app.services.cache_keys import menu_key
+from app.services.versions import bump_catalog_versions
 
 
 class MenuDict(TypedDict):
@@ -17,12 +22,14 @@ class MenuDict(TypedDict):
 
 
 async def invalidate_menu(cache: CacheRepository, menu_id: str) -> None:
-    await cache.delete_pattern(f'menu:{menu_id}*')
+    await cache.bump_generations(f'menu:{menu_id}')
     await cache.delete('menus:all')
+    await cache.delete('full_menu')
 
 
 async def invalidate_menu_all(cache: CacheRepository) -> None:
     await cache.delete('menus:all')
+    await cache.delete('full_menu')
 
 
 class MenuService:
@@ -35,15 +42,22 @@ class MenuService:
         self.menu_repository = menu_repository
         self.cache_repository = cache_repository
 
-    async def get_menus(self) -> list[MenuDict]:
-        """Возвращает список всех меню с кэшированием."""
+    async def get_menus(self, limit: int, after: UUID | None = None) -> bytes:
+        """Возвращает страницу списка меню в виде готового JSON с кэшированием."""
         cache_key = 'menus:all'
-        cached_menus = await self.cache_repository.get(cache_key)
-
-        if cached_menus:
-            return json.loads(cached_menus)
-
-        menus_data = await self.menu_repository.get_all_menus()
+        page_key = f'{after}:{limit}'
+        load = partial(self._load_menus, limit=limit, after=after)
+        return await self.cache_repository.get_or_fill(
+            cache_key,
+            lambda: load(self.menu_repository),
+            field=page_key,
+            ttl=CACHE_TTL_MENU,
+            refresh=in_new_session(MenuRepository, load)
+        )
+
+    async def _load_menus(self, menu_repository: MenuRepository, limit: int, after: UUID | None) -> bytes:
+        """Строит JSON из базы данных для заполнения кэша."""
+        menus_data = await menu_repository.get_all_menus(limit, after)
         menus_list: list[MenuDict] = [
             {
                 'id': str(menu.Menu.id),
@@ -54,19 +68,22 @@ class MenuService:
             }
             for menu in menus_data
         ]
-
-        await self.cache_repository.set(cache_key, json.dumps(menus_list), expire=60)
-        return menus_list
-
-    async def get_menu(self, menu_id: UUID) -> MenuDict:
-        """Возвращает детали меню по ID с кэшированием."""
-        cache_key = f'menu:{menu_id}'
-        cached_menu = await self.cache_repository.get(cache_key)
-
-        if cached_menu:
-            return json.loads(cached_menu)
-
-        menu_data = await self.menu_repository.get_menu_by_id(menu_id)
+        return self.cache_repository.serializer.dumps(to_jsonable(list[MenuModel], menus_list))
+
+    async def get_menu(self, menu_id: UUID) -> bytes:
+        """Возвращает детали меню по ID в виде готового JSON с кэшированием."""
+        cache_key = await menu_key(self.cache_repository, menu_id)
+        load = partial(self._load_menu, menu_id=menu_id)
+        return await self.cache_repository.get_or_fill(
+            cache_key,
+            lambda: load(self.menu_repository),
+            ttl=CACHE_TTL_MENU,
+            refresh=in_new_session(MenuRepository, load)
+        )
+
+    async def _load_menu(self, menu_repository: MenuRepository, menu_id: UUID) -> bytes:
+        """Строит JSON из базы данных для заполнения кэша."""
+        menu_data = await menu_repository.get_menu_by_id(menu_id)
         if menu_data is None:
             raise HTTPException(status_code=404, detail='menu not found')
 
@@ -77,8 +94,7 @@ class MenuService:
             'submenus_count': menu_data.submenus_count,
             'dishes_count': menu_data.dishes_count
         }
-        await self.cache_repository.set(cache_key, json.dumps(menu), expire=60)
-        return menu
+        return self.cache_repository.serializer.dumps(to_jsonable(MenuModel, menu))
 
     async def create_menu(self, menu_data: dict[str, Any], background_tasks: BackgroundTasks) -> MenuDict:
         """Создает новое меню и обновляет кэш."""
@@ -90,8 +106,13 @@ class MenuService:
             'submenus_count': 0,
             'dishes_count': 0
         }
-        await self.cache_repository.set(f'menu:{str(new_menu.id)}', json.dumps(menu_cache_data), expire=60)
+        await self.cache_repository.store_object(
+            await menu_key(self.cache_repository, menu_cache_data['id']),
+            to_jsonable(MenuModel, menu_cache_data),
+            ttl=CACHE_TTL_MENU
+        )
         background_tasks.add_task(invalidate_menu_all, self.cache_repository)
+        background_tasks.add_task(bump_catalog_versions, self.cache_repository)
         return menu_cache_data
 
     async def update_menu(self, menu_id: UUID, menu_data: dict[str, Any], background_tasks: BackgroundTasks) -> MenuDict:
@@ -107,8 +128,13 @@ class MenuService:
             'submenus_count': updated_menu.submenus_count,
             'dishes_count': updated_menu.dishes_count
         }
-        await self.cache_repository.set(f'menu:{menu_id}', json.dumps(new_menu_data), expire=60)
+        await self.cache_repository.store_object(
+            await menu_key(self.cache_repository, menu_id),
+            to_jsonable(MenuModel, new_menu_data),
+            ttl=CACHE_TTL_MENU
+        )
         background_tasks.add_task(invalidate_menu_all, self.cache_repository)
+        background_tasks.add_task(bump_catalog_versions, self.cache_repository, str(menu_id))
 
         return new_menu_data
 
@@ -116,3 +142,4 @@ class MenuService:
         """Удаляет меню и связанный с ним кэш."""
         await self.menu_repository.delete_menu(menu_id)
         background_tasks.add_task(invalidate_menu, self.cache_repository, str(menu_id))
+        background_tasks.add_task(bump_catalog_versions, self.cache_repository, str(menu_id))
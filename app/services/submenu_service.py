@@ -1,11 +1,16 @@
-import json
+from functools import partial
 from typing import Any, TypedDict
 from uuid import UUID
 
 from fastapi import BackgroundTasks, HTTPException
 
+from app.config import CACHE_TTL_SUBMENU
+from app.database import in_new_session
 from app.repositories.cache_repository import CacheRepository
 from app.repositories.submenu_repository import SubmenuRepository
+from app.schemas import SubmenuModel, to_jsonable
+from app.services.cache_keys import menu_key, submenu_key
+from app.services.versions import bump_catalog_versions
 
 
 class SubmenuDict(TypedDict):
@@ -16,17 +21,20 @@ class SubmenuDict(TypedDict):
 
 
 async def invalidate_submenu_menu_menus(cache: CacheRepository, menu_id: str) -> None:
-    await cache.delete(f'menu:{menu_id}/submenus:all')
-    await cache.delete(f'menu:{menu_id}')
+    menu_cache_key = await menu_key(cache, menu_id)
+    await cache.delete(f'{menu_cache_key}/submenus:all')
+    await cache.delete(menu_cache_key)
     await cache.delete('menus:all')
+    await cache.delete('full_menu')
 
 
 async def invalidate_submenus_all(cache: CacheRepository, menu_id: str) -> None:
-    await cache.delete(f'menu:{menu_id}/submenus:all')
+    await cache.delete(f'{await menu_key(cache, menu_id)}/submenus:all')
+    await cache.delete('full_menu')
 
 
-async def invalidate_submenu_pattern(cache: CacheRepository, menu_id: str, submenu_id: str) -> None:
-    await cache.delete_pattern(f'menu:{menu_id}/submenu:{submenu_id}*')
+async def invalidate_submenu_subtree(cache: CacheRepository, submenu_id: str) -> None:
+    await cache.bump_generations(f'submenu:{submenu_id}')
 
 
 class SubmenuService:
@@ -39,14 +47,28 @@ class SubmenuService:
         self.submenu_repository = submenu_repository
         self.cache_repository = cache_repository
 
-    async def get_submenus(self, menu_id: UUID) -> list[SubmenuDict]:
-        """Возвращает список всех подменю с кэшированием."""
-        cache_key = f'menu:{menu_id}/submenus:all'
-        cached_submenus = await self.cache_repository.get(cache_key)
-        if cached_submenus:
-            return json.loads(cached_submenus)
+    async def get_submenus(self, menu_id: UUID, limit: int, after: UUID | None = None) -> bytes:
+        """Возвращает страницу списка подменю в виде готового JSON с кэшированием."""
+        cache_key = f'{await menu_key(self.cache_repository, menu_id)}/submenus:all'
+        page_key = f'{after}:{limit}'
+        load = partial(self._load_submenus, menu_id=menu_id, limit=limit, after=after)
+        return await self.cache_repository.get_or_fill(
+            cache_key,
+            lambda: load(self.submenu_repository),
+            field=page_key,
+            ttl=CACHE_TTL_SUBMENU,
+            refresh=in_new_session(SubmenuRepository, load)
+        )
 
-        submenus_data = await self.submenu_repository.get_all_submenus_for_menu(menu_id)
+    async def _load_submenus(
+            self,
+            submenu_repository: SubmenuRepository,
+            menu_id: UUID,
+            limit: int,
+            after: UUID | None
+    ) -> bytes:
+        """Строит JSON из базы данных для заполнения кэша."""
+        submenus_data = await submenu_repository.get_all_submenus_for_menu(menu_id, limit, after)
         submenus_list: list[SubmenuDict] = [
             {
                 'id': str(submenu.Submenu.id),
@@ -56,18 +78,22 @@ class SubmenuService:
             }
             for submenu in submenus_data
         ]
-        await self.cache_repository.set(cache_key, json.dumps(submenus_list), expire=60)
-        return submenus_list
-
-    async def get_submenu(self, menu_id: UUID, submenu_id: UUID) -> SubmenuDict:
-        """Возвращает детали подменю по ID с кэшированием."""
-        cache_key = f'menu:{menu_id}/submenu:{submenu_id}'
-        cached_submenu = await self.cache_repository.get(cache_key)
-
-        if cached_submenu:
-            return json.loads(cached_submenu)
+        return self.cache_repository.serializer.dumps(to_jsonable(list[SubmenuModel], submenus_list))
+
+    async def get_submenu(self, menu_id: UUID, submenu_id: UUID) -> bytes:
+        """Возвращает детали подменю по ID в виде готового JSON с кэшированием."""
+        cache_key = await submenu_key(self.cache_repository, menu_id, submenu_id)
+        load = partial(self._load_submenu, submenu_id=submenu_id)
+        return await self.cache_repository.get_or_fill(
+            cache_key,
+            lambda: load(self.submenu_repository),
+            ttl=CACHE_TTL_SUBMENU,
+            refresh=in_new_session(SubmenuRepository, load)
+        )
 
-        submenu_data = await self.submenu_repository.get_submenu_by_id(submenu_id)
+    async def _load_submenu(self, submenu_repository: SubmenuRepository, submenu_id: UUID) -> bytes:
+        """Строит JSON из базы данных для заполнения кэша."""
+        submenu_data = await submenu_repository.get_submenu_by_id(submenu_id)
         if submenu_data is None:
             raise HTTPException(status_code=404, detail='submenu not found')
 
@@ -77,8 +103,7 @@ class SubmenuService:
             'description': submenu_data.Submenu.description,
             'dishes_count': submenu_data.dishes_count
         }
-        await self.cache_repository.set(cache_key, json.dumps(submenu), expire=60)
-        return submenu
+        return self.cache_repository.serializer.dumps(to_jsonable(SubmenuModel, submenu))
 
     async def create_submenu(
             self,
@@ -94,15 +119,17 @@ class SubmenuService:
             'description': new_submenu.description,
             'dishes_count': 0
         }
-        await self.cache_repository.set(
-            f'menu:{menu_id}/submenu:{str(new_submenu.id)}',
-            json.dumps(submenu_cache_data),
-            expire=60)
+        await self.cache_repository.store_object(
+            await submenu_key(self.cache_repository, menu_id, submenu_cache_data['id']),
+            to_jsonable(SubmenuModel, submenu_cache_data),
+            ttl=CACHE_TTL_SUBMENU
+        )
         background_tasks.add_task(
             invalidate_submenu_menu_menus,
             self.cache_repository,
             str(menu_id)
         )
+        background_tasks.add_task(bump_catalog_versions, self.cache_repository, str(menu_id))
         return submenu_cache_data
 
     async def update_submenu(
@@ -123,14 +150,17 @@ class SubmenuService:
             'description': updated_submenu.Submenu.description,
             'dishes_count': updated_submenu.dishes_count
         }
-        await self.cache_repository.set(f'menu:{menu_id}/submenu:{submenu_id}',
-                                        json.dumps(new_submenu_data),
-                                        expire=60)
+        await self.cache_repository.store_object(
+            await submenu_key(self.cache_repository, menu_id, submenu_id),
+            to_jsonable(SubmenuModel, new_submenu_data),
+            ttl=CACHE_TTL_SUBMENU
+        )
         background_tasks.add_task(
             invalidate_submenus_all,
             self.cache_repository,
             str(menu_id)
         )
+        background_tasks.add_task(bump_catalog_versions, self.cache_repository, str(menu_id), str(submenu_id))
         return new_submenu_data
 
     async def delete_submenu(
@@ -142,9 +172,8 @@ class SubmenuService:
         """Удаляет подменю и связанный с ним кэш."""
         await self.submenu_repository.delete_submenu(submenu_id)
         background_tasks.add_task(
-            invalidate_submenu_pattern,
+            invalidate_submenu_subtree,
             self.cache_repository,
-            str(menu_id),
             str(submenu_id)
         )
         background_tasks.add_task(
@@ -152,3 +181,4 @@ class SubmenuService:
             self.cache_repository,
             str(menu_id)
         )
+        background_tasks.add_task(bump_catalog_versions, self.cache_repository, str(menu_id), str(submenu_id))
@@ -0,0 +1,44 @@
+from uuid import UUID
+
+from app.repositories.cache_repository import CacheRepository
+
+CATALOG_VERSION = 'catalog'
+
+
+def menu_version(menu_id: UUID | str) -> str:
+    return f'menu:{menu_id}'
+
+
+def submenu_version(submenu_id: UUID | str) -> str:
+    return f'submenu:{submenu_id}'
+
+
+async def get_etag(cache: CacheRepository, *names: str) -> str:
+    """Возвращает слабый ETag, построенный по версиям сущностей, от которых зависит ответ."""
+    return f'W/"{await cache.get_version_tag(*names)}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Проверяет, совпадает ли ETag с одним из значений заголовка If-None-Match.
+
+    Значение * не совпадает ни с чем: ETag проверяется до загрузки ресурса,
+    и отсутствующий ресурс должен получить свой обычный ответ 404, а не 304.
+    """
+    if not if_none_match:
+        return False
+    opaque_etag = etag.removeprefix('W/')
+    return any(value.strip().removeprefix('W/') == opaque_etag for value in if_none_match.split(','))
+
+
+async def bump_catalog_versions(
+        cache: CacheRepository,
+        menu_id: str | None = None,
+        submenu_id: str | None = None
+) -> None:
+    """Увеличивает версию каталога и, если переданы, версии измененных меню и подменю."""
+    names = [CATALOG_VERSION]
+    if menu_id is not None:
+        names.append(menu_version(menu_id))
+    if submenu_id is not None:
+        names.append(submenu_version(submenu_id))
+    await cache.bump_versions(*names)
@@ -2,7 +2,7 @@ from datetime import timedelta
 
 from celery import Celery
 
-from app.config import RABBITMQ_HOST
+from app.config import MENU_SOURCE, RABBITMQ_HOST, SYNC_BEAT_INTERVAL
 
 # Инициализация Celery
 celery_app = Celery(
@@ -11,9 +11,14 @@ celery_app = Celery(
     include=['background.tasks']
 )
 
+# Задача синхронизации меню для выбранного источника.
+SYNC_TASK = 'update_menu_from_xlsx' if MENU_SOURCE == 'xlsx' else 'update_menu_from_sheet'
+
 celery_app.conf.beat_schedule = {
-    'update_menu_every_15_seconds': {
-        'task': 'update_menu_from_sheet',
-        'schedule': timedelta(seconds=15),
+    'update_menu': {
+        'task': SYNC_TASK,
+        'schedule': timedelta(seconds=SYNC_BEAT_INTERVAL),
+        # Запуск, не взятый воркером до следующего срабатывания beat, уже не нужен.
+        'options': {'expires': SYNC_BEAT_INTERVAL},
     },
 }
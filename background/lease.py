@@ -0,0 +1,69 @@
+import asyncio
+import contextlib
+import logging
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from aioredis import Redis
+
+from app.repositories.cache_repository import RELEASE_LOCK_SCRIPT
+
+logger = logging.getLogger(__name__)
+
+# Продлевает аренду, только если она все еще принадлежит этому держателю.
+EXTEND_LEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class LeaseLost(Exception):
+    """Аренда истекла или перешла к другому держателю, пока блок еще работал."""
+
+
+@dataclass
+class Lease:
+    key: str
+    token: str
+    lost: bool = False
+
+    def check(self) -> None:
+        """Прерывает работу держателя, если аренда потеряна: дальше может работать другой держатель."""
+        if self.lost:
+            raise LeaseLost(self.key)
+
+
+async def heartbeat(redis: Redis, lease: Lease, ttl: float) -> None:
+    """Продлевает аренду каждую треть ее срока, пока держатель работает."""
+    while True:
+        await asyncio.sleep(ttl / 3)
+        if not await redis.eval(EXTEND_LEASE_SCRIPT, 1, lease.key, lease.token, int(ttl * 1000)):
+            logger.warning('lease %s expired before heartbeat, another holder may have taken it', lease.key)
+            lease.lost = True
+            return
+
+
+@asynccontextmanager
+async def hold_lease(redis: Redis, key: str, ttl: float) -> AsyncIterator[Lease | None]:
+    """Берет аренду в Redis на время блока и продлевает ее в фоне.
+
+    Отдает None, если аренду держит другой процесс. Если держатель упадет, аренда истечет через ttl.
+    Держатель вызывает Lease.check перед записью, чтобы не продолжать работу с потерянной арендой.
+    """
+    lease = Lease(key=key, token=uuid.uuid4().hex)
+    if not await redis.set(key, lease.token, nx=True, px=int(ttl * 1000)):
+        yield None
+        return
+
+    heartbeat_task = asyncio.create_task(heartbeat(redis, lease, ttl))
+    try:
+        yield lease
+    finally:
+        heartbeat_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await heartbeat_task
+        await redis.eval(RELEASE_LOCK_SCRIPT, 1, key, lease.token)
@@ -0,0 +1,67 @@
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import UUID
+
+import orjson
+
+
+@dataclass
+class RowDiff:
+    """Строки таблицы, которые нужно вставить, обновить и удалить, чтобы привести БД к данным из таблицы."""
+    inserted: list[dict[str, Any]] = field(default_factory=list)
+    updated: list[dict[str, Any]] = field(default_factory=list)
+    deleted: list[UUID] = field(default_factory=list)
+
+    @property
+    def changed_ids(self) -> set[UUID]:
+        return {row['id'] for row in self.upserted} | set(self.deleted)
+
+    @property
+    def upserted(self) -> list[dict[str, Any]]:
+        return self.inserted + self.updated
+
+    def __bool__(self) -> bool:
+        return bool(self.inserted or self.updated or self.deleted)
+
+    def counts(self) -> str:
+        return f'+{len(self.inserted)} ~{len(self.updated)} -{len(self.deleted)}'
+
+
+def diff_rows(current: dict[UUID, dict[str, Any]], desired: dict[UUID, dict[str, Any]]) -> RowDiff:
+    """Сравнивает строки из БД со строками из таблицы по ID."""
+    diff = RowDiff()
+    for row_id, row in desired.items():
+        current_row = current.get(row_id)
+        if current_row is None:
+            diff.inserted.append(row)
+        elif any(current_row[column] != value for column, value in row.items()):
+            diff.updated.append(row)
+    diff.deleted = [row_id for row_id in current if row_id not in desired]
+    return diff
+
+
+def fingerprint(*tables: dict[UUID, dict[str, Any]]) -> str:
+    """Возвращает хэш разобранных строк таблицы, не зависящий от порядка строк."""
+    digest = hashlib.sha256()
+    for rows in tables:
+        for row_id in sorted(rows):
+            digest.update(orjson.dumps(rows[row_id], default=str, option=orjson.OPT_SORT_KEYS))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+def parent_ids(
+        ids: set[UUID],
+        parent_column: str,
+        current: dict[UUID, dict[str, Any]],
+        desired: dict[UUID, dict[str, Any]]
+) -> set[UUID]:
+    """Возвращает ID родителей строк до и после синхронизации: при переносе строки меняются оба."""
+    parents = set()
+    for row_id in ids:
+        for rows in (current, desired):
+            parent_id = rows.get(row_id, {}).get(parent_column)
+            if parent_id is not None:
+                parents.add(parent_id)
+    return parents
@@ -1,12 +1,31 @@
 import uuid
-from typing import Any
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Iterable, Iterator, NamedTuple, Sequence
 
+from app.models import Dish, Menu, Submenu
+from app.services.dish_service import parse_price, try_parse_discount
 from background.batch_models import (
     AddDiscountDishModel,
     BatchCreateMenuModel,
     BatchCreateSubmenuModel,
 )
 
+CENTS = Decimal('0.01')
+# Индекс столбца цены блюда в строке таблицы.
+PRICE_COLUMN = 5
+# Модели, в таблицы которых попадают строки таблицы меню.
+SheetModel = type[Menu] | type[Submenu] | type[Dish]
+
+
+class SheetParseError(ValueError):
+    """Некорректное значение в ячейке таблицы меню."""
+
+
+class SheetRecord(NamedTuple):
+    """Строка таблицы меню в виде записи, готовой к вставке в таблицу модели."""
+    model: SheetModel
+    row: dict[str, Any]
+
 
 def get_uuid(value):
     try:
@@ -16,6 +35,19 @@ def get_uuid(value):
         return False
 
 
+def parse_uuid(value: str) -> uuid.UUID | None:
+    """Возвращает UUID из ячейки или None, если в ячейке не UUID."""
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        return None
+
+
+def get_cell(row: Sequence[str], index: int) -> str:
+    """Возвращает значение ячейки, пустую строку для ячеек за концом строки."""
+    return row[index] if index < len(row) else ''
+
+
 def parse_sheet(data: list[Any]) -> list[BatchCreateMenuModel]:
     """Парсинг данных из google sheets"""
     current_col = 0
@@ -75,3 +107,49 @@ def parse_sheet(data: list[Any]) -> list[BatchCreateMenuModel]:
         )
 
     return result
+
+
+def iter_sheet_records(rows: Iterable[Sequence[str]]) -> Iterator[SheetRecord]:
+    """Потоково разбирает строки таблицы в формате google sheets в записи меню, подменю и блюд.
+
+    Разбор идет по тем же правилам, что и в parse_sheet: уровень строки определяется столбцом с UUID,
+    первая строка без UUID на ожидаемых уровнях завершает разбор.
+    """
+    depth = 0
+    menu_id = submenu_id = None
+    for row_number, row in enumerate(rows, start=1):
+        for level in range(depth, -1, -1):
+            record_id = parse_uuid(get_cell(row, level))
+            if record_id is not None:
+                break
+        else:
+            return
+
+        if level == 0:
+            menu_id = record_id
+            depth = 1
+            yield SheetRecord(Menu, {'id': record_id, 'title': get_cell(row, 1), 'description': get_cell(row, 2)})
+        elif level == 1:
+            submenu_id = record_id
+            depth = 2
+            yield SheetRecord(Submenu, {
+                'id': record_id,
+                'menu_id': menu_id,
+                'title': get_cell(row, 2),
+                'description': get_cell(row, 3),
+            })
+        else:
+            price = get_cell(row, PRICE_COLUMN)
+            try:
+                price = parse_price(price.replace(',', '.'))
+            except ValueError as error:
+                raise SheetParseError(f'row {row_number}, column {PRICE_COLUMN + 1}: {error}: {price!r}') from error
+            discount = get_cell(row, 6).replace(',', '.')
+            yield SheetRecord(Dish, {
+                'id': record_id,
+                'submenu_id': submenu_id,
+                'title': get_cell(row, 3),
+                'description': get_cell(row, 4),
+                'price': Decimal(price),
+                'discount': Decimal(str(try_parse_discount(discount))).quantize(CENTS, rounding=ROUND_HALF_UP),
+            })
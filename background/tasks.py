@@ -1,91 +1,295 @@
 import asyncio
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Iterable, Iterator
+from uuid import UUID
 
 import gspread
+from aioredis import Redis
+from celery import Task
+from celery.utils.log import get_task_logger
 from google.oauth2.service_account import Credentials
-from sqlalchemy import delete
+from sqlalchemy import any_, bindparam, delete, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import async_session_maker, get_redis_connection
+from app.config import (
+    MENU_XLSX_PATH,
+    SYNC_BEAT_INTERVAL,
+    SYNC_DEBOUNCE,
+    SYNC_INTERVAL_FACTOR,
+    SYNC_INTERVAL_MAX,
+    SYNC_LEASE_TTL,
+)
+from app.database import async_session_maker, init_redis_pool
 from app.models import Dish, Menu, Submenu
 from app.repositories.cache_repository import CacheRepository
-from app.services.dish_service import validate_price
+from app.repositories.menu_repository import MenuRepository
+from app.services.cache_keys import menu_keys
+from app.services.versions import CATALOG_VERSION, menu_version, submenu_version
 from background.celery_app import celery_app
-from background.sheet_parser import parse_sheet
+from background.lease import Lease, LeaseLost, hold_lease
+from background.sheet_diff import RowDiff, diff_rows, fingerprint, parent_ids
+from background.sheet_parser import SheetModel, SheetRecord, iter_sheet_records
+from background.worker import run_async
+from background.xlsx_source import file_mtime, read_xlsx_rows
 
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
 
+SHEET_FINGERPRINT_KEY = 'sheet:fingerprint'
+# Хранится ограниченное время, чтобы изменения, сделанные в обход таблицы, периодически сверялись с ней.
+SHEET_FINGERPRINT_EXPIRE = 10 * 60
+# Время изменения книги xlsx при последнем успешном импорте.
+XLSX_MTIME_KEY = 'xlsx:mtime'
+# Аренда, под которой выполняется синхронизация: одновременно идет только один запуск.
+SYNC_LEASE_KEY = 'sync:lease'
+# Длительности последних запусков и пауза, в течение которой запуски от beat пропускаются.
+SYNC_DURATIONS_KEY = 'sync:durations'
+SYNC_DURATIONS_WINDOW = 5
+SYNC_COOLDOWN_KEY = 'sync:cooldown'
+# Сколько раз запуск по запросу администратора ждет освобождения аренды.
+SYNC_TRIGGER_RETRIES = 10
+# Размер пакета строк в одном INSERT ... ON CONFLICT.
+SYNC_CHUNK_SIZE = 1000
 
-@celery_app.task(name='update_menu_from_sheet')
-def update_menu_from_sheet():
-    """Фоновая задача обновление меню из google sheets раз в 15 сек"""
+MENU_COLUMNS = ['title', 'description']
+SUBMENU_COLUMNS = ['menu_id', 'title', 'description']
+DISH_COLUMNS = ['submenu_id', 'title', 'description', 'price', 'discount']
+
+# Источник меню: загружает данные и синхронизирует их под арендой.
+SyncSource = Callable[[CacheRepository, Lease], Awaitable[dict[str, str]]]
+
+logger = get_task_logger(__name__)
+
+
+@contextmanager
+def log_phase(phase: str) -> Iterator[None]:
+    """Пишет в лог время выполнения этапа синхронизации."""
+    started = time.perf_counter()
+    yield
+    logger.info('sync menu: %s took %.3f s', phase, time.perf_counter() - started)
+
+
+def upsert(model: SheetModel, columns: list[str]) -> Any:
+    """Возвращает INSERT ... ON CONFLICT DO UPDATE для пакетной вставки строк в таблицу модели."""
+    stmt = insert(model)
+    return stmt.on_conflict_do_update(
+        index_elements=['id'],
+        set_={column: stmt.excluded[column] for column in columns}
+    )
+
+
+def batched(rows: list[dict[str, Any]], size: int) -> Iterator[list[dict[str, Any]]]:
+    """Делит строки на пакеты не больше size."""
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def in_ids(column: Any, ids: list[Any]) -> Any:
+    """Условие column IN ids с одним параметром-массивом вместо параметра на каждый ID."""
+    return column == any_(bindparam(f'{column.name}_ids', ids, type_=ARRAY(PG_UUID(as_uuid=True))))
+
+
+async def load_rows(session: AsyncSession, model: SheetModel, columns: list[str]) -> dict[Any, dict[str, Any]]:
+    """Загружает из БД текущие строки таблицы модели по ID."""
+    result = await session.execute(select(model.id, *(getattr(model, column) for column in columns)))
+    return {row['id']: dict(row) for row in result.mappings()}
+
+
+async def invalidate_changes(cache: CacheRepository, menu_ids: list[UUID], submenu_ids: list[UUID]) -> None:
+    """Сбрасывает кэш только измененных меню и подменю и зависящих от них общих списков."""
+    # Поколение подменю отсекает его детали, список блюд и сами блюда.
+    await cache.bump_generations(*(f'submenu:{submenu_id}' for submenu_id in submenu_ids))
+    # У меню меняются только детали и список подменю, кэш неизмененных подменю остается.
+    changed_menu_keys = await menu_keys(cache, menu_ids)
+    await cache.delete(
+        *changed_menu_keys,
+        *(f'{menu_key}/submenus:all' for menu_key in changed_menu_keys),
+        'menus:all',
+        'full_menu'
+    )
+    await cache.bump_versions(
+        CATALOG_VERSION,
+        *(menu_version(menu_id) for menu_id in menu_ids),
+        *(submenu_version(submenu_id) for submenu_id in submenu_ids)
+    )
+
+
+def collect_rows(records: Iterable[SheetRecord]) -> dict[SheetModel, dict[UUID, dict[str, Any]]]:
+    """Собирает записи таблицы в строки по моделям с ключами по ID."""
+    # Ключи по ID: повтор строки в таблице не должен дважды обновлять запись в одном запросе.
+    desired_rows: dict[SheetModel, dict[UUID, dict[str, Any]]] = {Menu: {}, Submenu: {}, Dish: {}}
+    for record in records:
+        desired_rows[record.model][record.row['id']] = record.row
+    return desired_rows
+
+
+async def sync_menu(
+        records: Iterable[SheetRecord],
+        cache_repository: CacheRepository,
+        lease: Lease
+) -> dict[str, str]:
+    """Синхронизирует БД и кэш с записями, разобранными из таблицы меню.
+
+    Перед каждой записью проверяет аренду: при потере аренды транзакция откатывается.
+    """
+    with log_phase('parse sheet'):
+        # Разбор выполняется в потоке, чтобы цикл событий продолжал продлевать аренду синхронизации.
+        desired_rows = await asyncio.to_thread(collect_rows, records)
+        menu_rows, submenu_rows, dish_rows = desired_rows[Menu], desired_rows[Submenu], desired_rows[Dish]
+        sheet_fingerprint = fingerprint(menu_rows, submenu_rows, dish_rows)
+
+    if await cache_repository.get(SHEET_FINGERPRINT_KEY) == sheet_fingerprint.encode():
+        logger.info('sync menu: sheet is unchanged, skipping')
+        return {}
+
+    async with async_session_maker() as session:
+        async with session.begin():
+            with log_phase('diff with database'):
+                current_submenus = await load_rows(session, Submenu, SUBMENU_COLUMNS)
+                current_dishes = await load_rows(session, Dish, DISH_COLUMNS)
+                menus_diff = diff_rows(await load_rows(session, Menu, MENU_COLUMNS), menu_rows)
+                submenus_diff = diff_rows(current_submenus, submenu_rows)
+                dishes_diff = diff_rows(current_dishes, dish_rows)
+            changes = {'menus': menus_diff, 'submenus': submenus_diff, 'dishes': dishes_diff}
+            logger.info(
+                'sync menu: changes %s',
+                ', '.join(f'{table} {diff.counts()}' for table, diff in changes.items())
+            )
+
+            if any(changes.values()):
+                lease.check()
+                with log_phase('upsert changed rows'):
+                    upserts: list[tuple[SheetModel, list[str], RowDiff]] = [
+                        (Menu, MENU_COLUMNS, menus_diff),
+                        (Submenu, SUBMENU_COLUMNS, submenus_diff),
+                        (Dish, DISH_COLUMNS, dishes_diff),
+                    ]
+                    for model, columns, diff in upserts:
+                        for chunk in batched(diff.upserted, SYNC_CHUNK_SIZE):
+                            await session.execute(upsert(model, columns), chunk)
+
+                lease.check()
+                with log_phase('delete missing rows'):
+                    deletes: list[tuple[SheetModel, RowDiff]] = [
+                        (Dish, dishes_diff),
+                        (Submenu, submenus_diff),
+                        (Menu, menus_diff),
+                    ]
+                    for model, diff in deletes:
+                        if diff.deleted:
+                            await session.execute(delete(model).where(in_ids(model.id, diff.deleted)))
+                with log_phase('refresh counters'):
+                    await MenuRepository(session=session).refresh_counters()
+                # Последняя проверка перед коммитом на выходе из session.begin().
+                lease.check()
+
+    if any(changes.values()):
+        # Кэш сбрасывается после коммита, иначе его успеют заполнить старыми данными.
+        with log_phase('invalidate cache'):
+            changed_submenus = submenus_diff.changed_ids | parent_ids(
+                dishes_diff.changed_ids, 'submenu_id', current_dishes, dish_rows
+            )
+            changed_menus = menus_diff.changed_ids | parent_ids(
+                changed_submenus, 'menu_id', current_submenus, submenu_rows
+            )
+            await invalidate_changes(cache_repository, list(changed_menus), list(changed_submenus))
+
+    await cache_repository.set(SHEET_FINGERPRINT_KEY, sheet_fingerprint, expire=SHEET_FINGERPRINT_EXPIRE)
+    return {table: diff.counts() for table, diff in changes.items()}
+
+
+@lru_cache(maxsize=1)
+def get_sheet() -> gspread.Worksheet:
+    """Открывает лист google sheets один раз на процесс воркера, токен доступа gspread обновляет сам."""
     creds = Credentials.from_service_account_file('background/creds.json', scopes=SCOPES)
     client = gspread.authorize(creds)
-    sheet = client.open('restmenu_sheet').sheet1
-    data = sheet.get_values()
-
-    async def update_db():
-        """Обновление меню из google sheets"""
-        menus = parse_sheet(data)
-
-        redis_connection = await get_redis_connection()
-        cache_repository = CacheRepository(redis=redis_connection)
-
-        async with async_session_maker() as session:
-            async with session.begin():
-                discount_dishes = {}
-                updated_menus = []
-                updated_submenus = []
-                updated_dishes = []
-                for menu in menus:
-                    updated_menus.append(menu.id)
-                    stmt = insert(Menu).values(
-                        id=menu.id,
-                        title=menu.title,
-                        description=menu.description
-                    ).on_conflict_do_update(
-                        index_elements=['id'],
-                        set_=dict(title=menu.title, description=menu.description)
-                    )
-                    await session.execute(stmt)
-
-                    for submenu in menu.submenus:
-                        updated_submenus.append(submenu.id)
-                        stmt = insert(Submenu).values(
-                            id=submenu.id,
-                            menu_id=menu.id,
-                            title=submenu.title,
-                            description=submenu.description
-                        ).on_conflict_do_update(
-                            index_elements=['id'],
-                            set_=dict(menu_id=menu.id, title=submenu.title, description=submenu.description)
-                        )
-                        await session.execute(stmt)
-
-                        for dish in submenu.dishes:
-                            updated_dishes.append(dish.id)
-                            if dish.discount:
-                                discount_dishes[dish.id] = dish.discount
-
-                            stmt = insert(Dish).values(
-                                id=dish.id,
-                                submenu_id=submenu.id,
-                                title=dish.title,
-                                description=dish.description,
-                                price=validate_price(dish.price)
-                            ).on_conflict_do_update(
-                                index_elements=['id'],
-                                set_=dict(submenu_id=submenu.id, title=dish.title, description=dish.description,
-                                          price=validate_price(dish.price))
-                            )
-                            await session.execute(stmt)
-
-                await session.execute(delete(Dish).where(Dish.id.notin_(updated_dishes)))
-                await session.execute(delete(Submenu).where(Submenu.id.notin_(updated_submenus)))
-                await session.execute(delete(Menu).where(Menu.id.notin_(updated_menus)))
-
-                await cache_repository.delete_all()
-                for dish_id, discount in discount_dishes.items():
-                    await cache_repository.set(f'{str(dish_id)}_discount', discount, expire=15)
-
-    loop = asyncio.get_event_loop()
-    loop.run_until_complete(update_db())
+    return client.open('restmenu_sheet').sheet1
+
+
+async def import_sheet(cache_repository: CacheRepository, lease: Lease) -> dict[str, str]:
+    """Обновление меню из google sheets."""
+    with log_phase('fetch sheet'):
+        # Запрос к google sheets выполняется в потоке, чтобы не останавливать продление аренды.
+        data = await asyncio.to_thread(lambda: get_sheet().get_values())
+    return await sync_menu(iter_sheet_records(data), cache_repository, lease)
+
+
+async def import_xlsx(cache_repository: CacheRepository, lease: Lease) -> dict[str, str]:
+    """Обновление меню из книги xlsx, если файл изменился с прошлого импорта."""
+    mtime = file_mtime(MENU_XLSX_PATH)
+    if await cache_repository.get(XLSX_MTIME_KEY) == mtime.encode():
+        logger.info('update_menu_from_xlsx: %s is unchanged, skipping', MENU_XLSX_PATH)
+        return {}
+
+    changes = await sync_menu(iter_sheet_records(read_xlsx_rows(MENU_XLSX_PATH)), cache_repository, lease)
+    await cache_repository.set(XLSX_MTIME_KEY, mtime)
+    return changes
+
+
+async def schedule_next_run(redis: Redis, duration: float) -> None:
+    """Запоминает длительность запуска и откладывает следующие, если последние запуски были долгими."""
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.lpush(SYNC_DURATIONS_KEY, duration)
+        pipe.ltrim(SYNC_DURATIONS_KEY, 0, SYNC_DURATIONS_WINDOW - 1)
+        pipe.lrange(SYNC_DURATIONS_KEY, 0, -1)
+        *_, durations = await pipe.execute()
+    average = sum(float(value) for value in durations) / len(durations)
+    interval = min(max(SYNC_INTERVAL_FACTOR * average, SYNC_BEAT_INTERVAL), SYNC_INTERVAL_MAX)
+    logger.info('sync menu: average run %.3f s, next run in %.0f s', average, interval)
+    # Beat срабатывает каждые SYNC_BEAT_INTERVAL секунд, пропускать нужно только сверх этого.
+    if interval > SYNC_BEAT_INTERVAL:
+        await redis.set(SYNC_COOLDOWN_KEY, 1, px=int((interval - SYNC_BEAT_INTERVAL) * 1000))
+
+
+async def run_exclusive(
+        sync: SyncSource,
+        ignore_cooldown: bool = False
+) -> dict[str, str] | None:
+    """Выполняет синхронизацию под общей для всех воркеров арендой.
+
+    Возвращает None, если запуск пропущен: другая синхронизация еще идет, после долгих запусков не вышла пауза
+    или аренда потеряна посреди запуска.
+    """
+    redis = init_redis_pool()
+    if not ignore_cooldown and await redis.exists(SYNC_COOLDOWN_KEY):
+        logger.info('sync menu: recent runs were slow, skipping until the cooldown expires')
+        return None
+
+    async with hold_lease(redis, SYNC_LEASE_KEY, SYNC_LEASE_TTL) as lease:
+        if lease is None:
+            logger.info('sync menu: another sync holds the lease, skipping')
+            return None
+        started = time.perf_counter()
+        try:
+            changes = await sync(CacheRepository(redis=redis), lease)
+        except LeaseLost:
+            logger.warning('sync menu: lease lost during the run, changes rolled back')
+            return None
+        await schedule_next_run(redis, time.perf_counter() - started)
+    return changes
+
+
+def run_sync_task(task: Task, sync: SyncSource, triggered: bool) -> Any:
+    """Выполняет задачу синхронизации; запуск по запросу администратора не теряется при занятой аренде."""
+    with log_phase('total database sync'):
+        changes = run_async(run_exclusive(sync, ignore_cooldown=triggered))
+    if changes is None and triggered:
+        # Идущая синхронизация могла прочитать источник до изменений, ради которых пришел запрос.
+        raise task.retry(countdown=SYNC_DEBOUNCE)
+    return changes
+
+
+@celery_app.task(name='update_menu_from_sheet', bind=True, max_retries=SYNC_TRIGGER_RETRIES)
+def update_menu_from_sheet(self: Task, triggered: bool = False):
+    """Фоновая задача обновление меню из google sheets по расписанию beat или по запросу администратора"""
+    return run_sync_task(self, import_sheet, triggered)
+
+
+@celery_app.task(name='update_menu_from_xlsx', bind=True, max_retries=SYNC_TRIGGER_RETRIES)
+def update_menu_from_xlsx(self: Task, triggered: bool = False):
+    """Фоновая задача обновления меню из локальной книги xlsx, если файл изменился с прошлого импорта"""
+    return run_sync_task(self, import_xlsx, triggered)
@@ -0,0 +1,47 @@
+import asyncio
+from typing import Any, Coroutine, TypeVar
+
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
+
+from app.database import close_redis_pool, engine, init_redis_pool
+
+T = TypeVar('T')
+
+# Цикл событий процесса воркера: движок БД и пул Redis привязаны к нему и живут между запусками задач.
+loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Возвращает цикл событий процесса, создавая его при первом обращении."""
+    global loop
+    if loop is None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+    return loop
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """Выполняет корутину задачи в постоянном цикле событий процесса воркера."""
+    return get_loop().run_until_complete(coro)
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs: Any) -> None:
+    """Готовит дочерний процесс воркера: свой цикл событий, движок БД и пул Redis."""
+    # Соединения пула, унаследованные от родительского процесса при fork, использовать нельзя.
+    engine.sync_engine.dispose(close=False)
+    get_loop()
+    init_redis_pool()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def shutdown_worker_process(**kwargs: Any) -> None:
+    """Закрывает соединения с БД и Redis и цикл событий при остановке процесса воркера."""
+    global loop
+    if loop is None:
+        return
+    loop.run_until_complete(close_redis_pool())
+    loop.run_until_complete(engine.dispose())
+    loop.close()
+    loop = None
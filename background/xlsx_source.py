@@ -0,0 +1,39 @@
+import os
+import uuid
+from typing import Iterator
+
+from openpyxl import load_workbook
+
+from background.sheet_parser import get_uuid
+
+# Отступ до трех уровней, название, описание, цена и скидка блюда — ширина строки, которую читает parse_sheet.
+ROW_WIDTH = 7
+# Пространство имен для ID из порядковых номеров книги: одна и та же позиция всегда получает один и тот же UUID.
+XLSX_ID_NAMESPACE = uuid.UUID('6f1d3c2e-8a4b-5e7f-9c10-2b3d4e5f6a7b')
+
+
+def file_mtime(path: str) -> str:
+    """Возвращает время изменения файла с точностью до наносекунд."""
+    return str(os.stat(path).st_mtime_ns)
+
+
+def read_xlsx_rows(path: str) -> Iterator[list[str]]:
+    """Построчно читает первый лист книги в потоковом режиме и отдает строки в формате google sheets.
+
+    Порядковые номера меню, подменю и блюд заменяются на UUID, производные от пути к позиции в книге.
+    """
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        numbers: list[str] = []
+        for values in workbook.worksheets[0].iter_rows(max_col=ROW_WIDTH, values_only=True):
+            row = ['' if value is None else str(value) for value in values]
+            row.extend([''] * (ROW_WIDTH - len(row)))
+            level = next((col for col in range(3) if row[col]), None)
+            if level is None:
+                continue
+            numbers = numbers[:level] + [row[level]]
+            if not get_uuid(row[level]):
+                row[level] = str(uuid.uuid5(XLSX_ID_NAMESPACE, '/'.join(numbers)))
+            yield row
+    finally:
+        workbook.close()
@@ -0,0 +1,105 @@
+"""Задержка get_menus / get_dishes при попадании в кэш: прежний путь с разбором и повторной проверкой
+JSON против отдачи сохраненных байтов как есть.
+
+Запуск (нужен доступный Redis из .env):
+
+    python -m benchmarks.bench_cache_hit
+"""
+import asyncio
+import time
+import uuid
+from typing import Any, cast
+
+import aioredis
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+from app.database import REDIS_URL
+from app.repositories.cache_repository import CacheRepository
+from app.repositories.dish_repository import DishRepository
+from app.repositories.menu_repository import MenuRepository
+from app.schemas import DishModel, MenuModel, to_jsonable
+from app.services.cache_keys import submenu_key
+from app.services.dish_service import DishService
+from app.services.menu_service import MenuService
+
+PAGE_SIZES = (10, 100, 1000)
+REPEATS = 200
+
+
+async def measure(func, *args) -> float:
+    """Возвращает среднее время выполнения корутины в миллисекундах."""
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        await func(*args)
+    return (time.perf_counter() - started) / REPEATS * 1000
+
+
+def make_page(size: int) -> tuple[list[dict], list[dict]]:
+    menus = [
+        {
+            'id': str(uuid.uuid4()),
+            'title': f'Меню {i}',
+            'description': f'Описание меню {i}',
+            'submenus_count': 10,
+            'dishes_count': 100,
+        }
+        for i in range(size)
+    ]
+    dishes = [
+        {
+            'id': str(uuid.uuid4()),
+            'title': f'Блюдо {i}',
+            'description': f'Описание блюда {i}',
+            'price': f'{i}.50',
+        }
+        for i in range(size)
+    ]
+    return menus, dishes
+
+
+def decoded_hit(schema: Any, body: bytes) -> Response:
+    """Прежний путь попадания: разбор JSON, проверка по схеме ответа и повторная сериализация."""
+    return ORJSONResponse(to_jsonable(schema, orjson.loads(body)))
+
+
+def raw_hit(body: bytes) -> Response:
+    """Текущий путь попадания: сохраненные байты отдаются без разбора."""
+    return Response(content=body, media_type='application/json')
+
+
+async def main() -> None:
+    redis = aioredis.from_url(REDIS_URL)
+    cache_repository = CacheRepository(redis)
+    # При попадании в кэш репозитории БД не вызываются.
+    menu_service = MenuService(menu_repository=cast(MenuRepository, None), cache_repository=cache_repository)
+    dish_service = DishService(dish_repository=cast(DishRepository, None), cache_repository=cache_repository)
+    menu_id, submenu_id = uuid.uuid4(), uuid.uuid4()
+
+    print(f'{"page":>6} {"endpoint":>12} {"decode, ms":>12} {"raw bytes, ms":>15}')
+    for page_size in PAGE_SIZES:
+        menus, dishes = make_page(page_size)
+        page_key = f'None:{page_size}'
+        dishes_key = f'{await submenu_key(cache_repository, menu_id, submenu_id)}/dishes:all'
+        await cache_repository.store_object('menus:all', menus, field=page_key)
+        await cache_repository.store_object(dishes_key, dishes, field=page_key)
+
+        async def get_menus(decode: bool) -> Response:
+            body = await menu_service.get_menus(page_size)
+            return decoded_hit(list[MenuModel], body) if decode else raw_hit(body)
+
+        async def get_dishes(decode: bool) -> Response:
+            body = await dish_service.get_dishes(menu_id, submenu_id, page_size)
+            return decoded_hit(list[DishModel], body) if decode else raw_hit(body)
+
+        for endpoint, func in (('get_menus', get_menus), ('get_dishes', get_dishes)):
+            decoded = await measure(func, True)
+            raw = await measure(func, False)
+            print(f'{page_size:>6} {endpoint:>12} {decoded:>12.3f} {raw:>15.3f}')
+        await redis.delete('menus:all', dishes_key)
+    await redis.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
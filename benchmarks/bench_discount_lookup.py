@@ -0,0 +1,51 @@
+"""Сравнение задержки получения скидок: GET на каждое блюдо против одного MGET.
+
+Запуск (нужен доступный Redis из .env):
+
+    python -m benchmarks.bench_discount_lookup
+"""
+import asyncio
+import time
+import uuid
+
+import aioredis
+
+from app.database import REDIS_URL
+from app.repositories.cache_repository import CacheRepository
+
+DISHES_COUNTS = (10, 100, 1000)
+REPEATS = 50
+
+
+async def measure(func, *args) -> float:
+    """Возвращает среднее время выполнения корутины в миллисекундах."""
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        await func(*args)
+    return (time.perf_counter() - started) / REPEATS * 1000
+
+
+async def get_one_by_one(cache_repository: CacheRepository, keys: list[str]) -> list[bytes | None]:
+    return [await cache_repository.get(key) for key in keys]
+
+
+async def main() -> None:
+    redis = aioredis.from_url(REDIS_URL)
+    cache_repository = CacheRepository(redis)
+
+    print(f'{"dishes":>8} {"GET x N, ms":>14} {"MGET, ms":>10}')
+    for dishes_count in DISHES_COUNTS:
+        keys = [f'{uuid.uuid4()}_discount' for _ in range(dishes_count)]
+        for key in keys[::2]:
+            await cache_repository.set(key, '10', expire=60)
+
+        one_by_one = await measure(get_one_by_one, cache_repository, keys)
+        batched = await measure(cache_repository.get_many, keys)
+        print(f'{dishes_count:>8} {one_by_one:>14.2f} {batched:>10.2f}')
+
+        await redis.delete(*keys)
+    await redis.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+"""Сравнение сборки полного меню в Python (convert_full_data) и в Postgres (json_agg).
+
+Генерирует каталог на 50 000 блюд, замеряет оба способа и удаляет сгенерированные данные.
+Запуск (нужны доступные Postgres с примененными миграциями и Redis из .env):
+
+    python -m benchmarks.bench_full_menu
+"""
+import asyncio
+import time
+import uuid
+from typing import Any
+
+import aioredis
+from pydantic import TypeAdapter
+from sqlalchemy import delete, insert
+
+from app.database import REDIS_URL, async_session_maker
+from app.models import Dish, Menu, Submenu
+from app.repositories.cache_repository import CacheRepository
+from app.repositories.menu_repository import MenuRepository
+from app.schemas import FullMenuModel
+from app.services.full_menu_service import FullMenuService, convert_full_data
+
+MENUS_COUNT = 50
+SUBMENUS_PER_MENU = 20
+DISHES_PER_SUBMENU = 50
+REPEATS = 5
+
+full_menu_adapter = TypeAdapter(list[FullMenuModel])
+
+
+async def generate_catalog() -> list[uuid.UUID]:
+    """Создает меню, подменю и блюда для замеров и возвращает ID созданных меню."""
+    menus: list[dict[str, Any]] = []
+    submenus: list[dict[str, Any]] = []
+    dishes: list[dict[str, Any]] = []
+    for menu_number in range(MENUS_COUNT):
+        menu_id = uuid.uuid4()
+        menus.append({'id': menu_id, 'title': f'menu {menu_number}', 'description': 'bench'})
+        for submenu_number in range(SUBMENUS_PER_MENU):
+            submenu_id = uuid.uuid4()
+            submenus.append({
+                'id': submenu_id,
+                'menu_id': menu_id,
+                'title': f'submenu {submenu_number}',
+                'description': 'bench',
+            })
+            for dish_number in range(DISHES_PER_SUBMENU):
+                dishes.append({
+                    'id': uuid.uuid4(),
+                    'submenu_id': submenu_id,
+                    'title': f'dish {dish_number}',
+                    'description': 'bench',
+                    'price': f'{dish_number + 0.5:.2f}',
+                })
+
+    async with async_session_maker() as session:
+        async with session.begin():
+            await session.execute(insert(Menu), menus)
+            await session.execute(insert(Submenu), submenus)
+            await session.execute(insert(Dish), dishes)
+    return [menu['id'] for menu in menus]
+
+
+async def python_path(cache_repository: CacheRepository) -> bytes:
+    async with async_session_maker() as session:
+        results = await MenuRepository(session).get_full_menus()
+        return full_menu_adapter.dump_json(convert_full_data(results))
+
+
+async def postgres_path(cache_repository: CacheRepository) -> bytes:
+    async with async_session_maker() as session:
+        await cache_repository.delete('full_menu')
+        return await FullMenuService(MenuRepository(session), cache_repository).get_full_menus()
+
+
+async def measure(func, *args) -> float:
+    """Возвращает среднее время выполнения корутины в миллисекундах."""
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        await func(*args)
+    return (time.perf_counter() - started) / REPEATS * 1000
+
+
+async def main() -> None:
+    redis = aioredis.from_url(REDIS_URL)
+    cache_repository = CacheRepository(redis)
+
+    menus_ids = await generate_catalog()
+    try:
+        dishes_count = MENUS_COUNT * SUBMENUS_PER_MENU * DISHES_PER_SUBMENU
+        print(f'dishes: {dishes_count}')
+        print(f'convert_full_data: {await measure(python_path, cache_repository):.1f} ms')
+        print(f'json_agg:          {await measure(postgres_path, cache_repository):.1f} ms')
+    finally:
+        async with async_session_maker() as session:
+            async with session.begin():
+                await session.execute(delete(Menu).where(Menu.id.in_(menus_ids)))
+        await cache_repository.delete('full_menu')
+        await redis.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
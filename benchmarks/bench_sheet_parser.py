@@ -0,0 +1,88 @@
+"""Разбор таблицы меню на 10 000 / 100 000 / 1 000 000 строк: parse_sheet против потокового iter_sheet_records.
+
+Оба варианта доводят разбор до плоских строк по ID, которые сверяет и пишет синхронизация. parse_sheet получает список
+всех строк таблицы, iter_sheet_records — генератор строк, как при чтении книги xlsx.
+
+Запуск (БД и Redis не нужны):
+
+    python -m benchmarks.bench_sheet_parser
+"""
+import time
+import tracemalloc
+import uuid
+from collections.abc import Callable, Iterator
+from decimal import ROUND_HALF_UP, Decimal
+
+from app.services.dish_service import try_parse_discount, validate_price
+from background.sheet_parser import CENTS, iter_sheet_records, parse_sheet
+
+ROW_COUNTS = (10_000, 100_000, 1_000_000)
+SUBMENUS_PER_MENU = 10
+DISHES_PER_SUBMENU = 50
+
+
+def make_rows(rows: int) -> Iterator[list[str]]:
+    """Генерирует строки таблицы меню в формате google sheets."""
+    written = 0
+    while written < rows:
+        yield [str(uuid.uuid4()), 'Меню', 'Описание меню', '', '', '', '']
+        written += 1
+        for _ in range(SUBMENUS_PER_MENU):
+            yield ['', str(uuid.uuid4()), 'Подменю', 'Описание подменю', '', '', '']
+            written += 1
+            for dish in range(DISHES_PER_SUBMENU):
+                yield ['', '', str(uuid.uuid4()), 'Блюдо', 'Описание блюда', f'{100 + dish},50', str(dish % 30)]
+                written += 1
+
+
+def parse_nested(rows: int) -> int:
+    """Разбор через parse_sheet с последующим переводом дерева моделей в плоские строки, как до потокового разбора."""
+    desired_rows = {}
+    for menu in parse_sheet(list(make_rows(rows))):
+        desired_rows[menu.id] = {'id': menu.id, 'title': menu.title, 'description': menu.description}
+        for submenu in menu.submenus:
+            desired_rows[submenu.id] = {
+                'id': submenu.id,
+                'menu_id': menu.id,
+                'title': submenu.title,
+                'description': submenu.description,
+            }
+            for dish in submenu.dishes:
+                desired_rows[dish.id] = {
+                    'id': dish.id,
+                    'submenu_id': submenu.id,
+                    'title': dish.title,
+                    'description': dish.description,
+                    'price': Decimal(validate_price(dish.price.replace(',', '.'))),
+                    'discount': Decimal(str(try_parse_discount(dish.discount))).quantize(CENTS, ROUND_HALF_UP),
+                }
+    return len(desired_rows)
+
+
+def parse_streaming(rows: int) -> int:
+    """Разбор через iter_sheet_records без промежуточного списка и дерева моделей."""
+    desired_rows = {record.row['id']: record.row for record in iter_sheet_records(make_rows(rows))}
+    return len(desired_rows)
+
+
+def measure(func: Callable[[int], int], rows: int) -> tuple[float, float]:
+    """Возвращает время в секундах и пиковую память в МБ."""
+    started = time.perf_counter()
+    func(rows)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    func(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main() -> None:
+    for rows in ROW_COUNTS:
+        for name, func in (('parse_sheet', parse_nested), ('iter_sheet_records', parse_streaming)):
+            elapsed, peak = measure(func, rows)
+            print(f'{rows:>9} rows  {name:<18} {elapsed:7.2f} s  peak {peak:8.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Пиковая память чтения книги xlsx: обычная загрузка openpyxl против потокового read_only режима.
+
+Запуск (БД и Redis не нужны):
+
+    python -m benchmarks.bench_xlsx_import
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from openpyxl import Workbook, load_workbook
+
+from background.xlsx_source import read_xlsx_rows
+
+ROW_COUNTS = (10_000, 100_000)
+SUBMENUS_PER_MENU = 10
+DISHES_PER_SUBMENU = 50
+
+
+def make_workbook(path: str, rows: int) -> None:
+    """Записывает книгу заданного размера в формате admin/Menu.xlsx."""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    written = menu = 0
+    while written < rows:
+        menu += 1
+        sheet.append([menu, f'Меню {menu}', f'Описание меню {menu}'])
+        written += 1
+        for submenu in range(1, SUBMENUS_PER_MENU + 1):
+            sheet.append([None, submenu, f'Подменю {submenu}', f'Описание подменю {submenu}'])
+            written += 1
+            for dish in range(1, DISHES_PER_SUBMENU + 1):
+                sheet.append([None, None, dish, f'Блюдо {dish}', f'Описание блюда {dish}', 100 + dish / 100, dish % 30])
+                written += 1
+    workbook.save(path)
+
+
+def read_full(path: str) -> int:
+    """Загружает книгу целиком и обходит все строки."""
+    workbook = load_workbook(path, data_only=True)
+    rows = sum(1 for _ in workbook.worksheets[0].iter_rows(values_only=True))
+    workbook.close()
+    return rows
+
+
+def read_streaming(path: str) -> int:
+    """Обходит строки книги так же, как импорт, не удерживая их в памяти."""
+    return sum(1 for _ in read_xlsx_rows(path))
+
+
+def measure(func: Callable[[str], int], path: str) -> tuple[float, float]:
+    """Возвращает время в секундах и пиковую память в МБ."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    func(path)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in ROW_COUNTS:
+            path = os.path.join(directory, f'menu_{rows}.xlsx')
+            make_workbook(path, rows)
+            for name, func in (('load_workbook', read_full), ('read_only stream', read_streaming)):
+                elapsed, peak = measure(func, path)
+                print(f'{rows:>7} rows  {name:<16} {elapsed:7.2f} s  peak {peak:8.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
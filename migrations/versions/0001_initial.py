@@ -0,0 +1,55 @@
+"""initial
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 12:00:00
+"""
+from typing import Sequence
+
+from alembic import op
+
+revision: str = '0001'
+down_revision: str | None = None
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS позволяет применить миграцию к базам, созданным через
+    # Base.metadata.create_all до появления миграций, в том числе без счетчиков.
+    op.execute(
+        'CREATE TABLE IF NOT EXISTS menu ('
+        'id UUID NOT NULL PRIMARY KEY, '
+        'title VARCHAR NOT NULL, '
+        'description VARCHAR NOT NULL)'
+    )
+    op.execute(
+        'CREATE TABLE IF NOT EXISTS submenu ('
+        'id UUID NOT NULL PRIMARY KEY, '
+        'title VARCHAR NOT NULL, '
+        'description VARCHAR NOT NULL, '
+        'menu_id UUID REFERENCES menu (id) ON DELETE CASCADE)'
+    )
+    op.execute(
+        'CREATE TABLE IF NOT EXISTS dish ('
+        'id UUID NOT NULL PRIMARY KEY, '
+        'title VARCHAR NOT NULL, '
+        'description VARCHAR NOT NULL, '
+        'price VARCHAR NOT NULL, '
+        'submenu_id UUID REFERENCES submenu (id) ON DELETE CASCADE)'
+    )
+    op.execute("ALTER TABLE menu ADD COLUMN IF NOT EXISTS submenus_count INTEGER NOT NULL DEFAULT '0'")
+    op.execute("ALTER TABLE menu ADD COLUMN IF NOT EXISTS dishes_count INTEGER NOT NULL DEFAULT '0'")
+    op.execute("ALTER TABLE submenu ADD COLUMN IF NOT EXISTS dishes_count INTEGER NOT NULL DEFAULT '0'")
+    op.execute('UPDATE submenu SET dishes_count = (SELECT count(*) FROM dish WHERE dish.submenu_id = submenu.id)')
+    op.execute(
+        'UPDATE menu SET '
+        'submenus_count = (SELECT count(*) FROM submenu WHERE submenu.menu_id = menu.id), '
+        'dishes_count = (SELECT coalesce(sum(submenu.dishes_count), 0) FROM submenu WHERE submenu.menu_id = menu.id)'
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('dish')
+    op.drop_table('submenu')
+    op.drop_table('menu')
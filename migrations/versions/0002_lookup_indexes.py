@@ -0,0 +1,26 @@
+"""lookup indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:10:00
+"""
+from typing import Sequence
+
+from alembic import op
+
+revision: str = '0002'
+down_revision: str | None = '0001'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Составные индексы покрывают выборку по родителю, каскадное удаление
+    # и упорядоченный по id обход дерева полного меню.
+    op.create_index('ix_submenu_menu_id', 'submenu', ['menu_id', 'id'])
+    op.create_index('ix_dish_submenu_id', 'dish', ['submenu_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_dish_submenu_id', table_name='dish')
+    op.drop_index('ix_submenu_menu_id', table_name='submenu')
@@ -0,0 +1,37 @@
+"""numeric price and dish discount
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 12:20:00
+"""
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = '0003'
+down_revision: str | None = '0002'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        'dish',
+        'price',
+        type_=sa.Numeric(10, 2),
+        existing_nullable=False,
+        postgresql_using='price::numeric(10, 2)',
+    )
+    op.add_column('dish', sa.Column('discount', sa.Numeric(5, 2), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('dish', 'discount')
+    op.alter_column(
+        'dish',
+        'price',
+        type_=sa.String(),
+        existing_nullable=False,
+        postgresql_using='price::varchar',
+    )
@@ -0,0 +1,23 @@
+"""dish discount range check
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 13:40:00
+"""
+from typing import Sequence
+
+from alembic import op
+
+revision: str = '0004'
+down_revision: str | None = '0003'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.execute('UPDATE dish SET discount = LEAST(GREATEST(discount, 0), 100) WHERE discount < 0 OR discount > 100')
+    op.create_check_constraint('ck_dish_discount_range', 'dish', 'discount >= 0 AND discount <= 100')
+
+
+def downgrade() -> None:
+    op.drop_constraint('ck_dish_discount_range', 'dish', type_='check')
@@ -72,7 +72,7 @@ async def dish_repo(db_session: AsyncSession) -> AsyncGenerator[DishRepository,
 
 @pytest_asyncio.fixture
 async def redis() -> AsyncGenerator[Redis, None]:
-    yield aioredis.from_url(REDIS_URL, encoding='utf-8', decode_responses=True)
+    yield aioredis.from_url(REDIS_URL)
 
 
 @pytest_asyncio.fixture
@@ -0,0 +1,51 @@
+import pytest
+from httpx import AsyncClient
+
+from app.repositories.cache_repository import CacheRepository
+from app.routers import router_admin
+from app.services.admin_service import SYNC_TRIGGER_KEY
+from background.celery_app import SYNC_TASK, celery_app
+from tests.utils import reverse
+
+
+class TestAdminAPI:
+    @pytest.fixture(scope='function')
+    def sent_tasks(self, monkeypatch: pytest.MonkeyPatch) -> list[tuple]:
+        """Фикстура задает токен администратора и собирает задачи, отправленные в брокер."""
+        sent = []
+        monkeypatch.setattr(router_admin, 'ADMIN_TOKEN', 'secret')
+        monkeypatch.setattr(celery_app, 'send_task', lambda name, **options: sent.append((name, options)))
+        return sent
+
+    async def test_when_sync_without_token_then_unauthorized(
+            self,
+            client: AsyncClient,
+            sent_tasks: list[tuple],
+    ) -> None:
+        """Тест запускает синхронизацию без токена и с неверным токеном и ожидает 401."""
+        response = await client.post(reverse('trigger_sync'))
+        assert response.status_code == 401
+
+        response = await client.post(reverse('trigger_sync'), headers={'Authorization': 'Bearer wrong'})
+        assert response.status_code == 401
+        assert sent_tasks == []
+
+    async def test_when_sync_triggered_twice_then_one_run_scheduled(
+            self,
+            client: AsyncClient,
+            cache_repo: CacheRepository,
+            sent_tasks: list[tuple],
+    ) -> None:
+        """Тест дважды запускает синхронизацию в окне антидребезга и ожидает одну задачу в очереди."""
+        await cache_repo.delete(SYNC_TRIGGER_KEY)
+        headers = {'Authorization': 'Bearer secret'}
+
+        first = await client.post(reverse('trigger_sync'), headers=headers)
+        second = await client.post(reverse('trigger_sync'), headers=headers)
+
+        assert first.status_code == second.status_code == 202
+        assert first.json() == {'status': 'scheduled'}
+        assert second.json() == {'status': 'already scheduled'}
+        assert [name for name, _ in sent_tasks] == [SYNC_TASK]
+        assert sent_tasks[0][1]['kwargs'] == {'triggered': True}
+        await cache_repo.delete(SYNC_TRIGGER_KEY)
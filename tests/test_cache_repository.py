@@ -0,0 +1,105 @@
+import asyncio
+import uuid
+
+from aioredis import Redis
+
+from app.repositories.cache_repository import CacheRepository
+from app.repositories.local_cache import LocalCache
+
+
+class TestCacheRepository:
+    async def test_when_concurrent_misses_then_filled_once(self, cache_repo: CacheRepository) -> None:
+        """Тест запрашивает отсутствующий ключ конкурентно и ожидает, что значение построено один раз."""
+        key = f'test:{uuid.uuid4()}'
+        fills = 0
+
+        async def fill() -> bytes:
+            nonlocal fills
+            fills += 1
+            await asyncio.sleep(0.1)
+            return b'[]'
+
+        values = await asyncio.gather(*(cache_repo.get_or_fill(key, fill, ttl=60) for _ in range(20)))
+
+        assert fills == 1
+        assert values == [b'[]'] * 20
+        assert await cache_repo.get_or_fill(key, fill, ttl=60) == b'[]'
+        assert fills == 1
+
+    async def test_when_soft_ttl_expired_then_stale_value_returned_and_refreshed(
+            self,
+            cache_repo: CacheRepository,
+    ) -> None:
+        """Тест читает значение после мягкого TTL и ожидает старое значение сразу и новое после обновления."""
+        key = f'test:{uuid.uuid4()}'
+        await cache_repo.store(key, b'"old"', ttl=0)
+
+        async def fill() -> bytes:
+            return b'"new"'
+
+        assert await cache_repo.get_or_fill(key, fill, ttl=60) == b'"old"'
+        await asyncio.sleep(0.1)
+        assert await cache_repo.get_or_fill(key, fill, ttl=60) == b'"new"'
+
+    async def test_when_filling_request_cancelled_then_waiters_still_get_value(
+            self,
+            cache_repo: CacheRepository,
+    ) -> None:
+        """Тест отменяет запрос, который строит значение, и ожидает, что остальные получат значение, а не отмену."""
+        key = f'test:{uuid.uuid4()}'
+        fills = 0
+
+        async def fill() -> bytes:
+            nonlocal fills
+            fills += 1
+            await asyncio.sleep(0.1)
+            return b'[]'
+
+        filler = asyncio.create_task(cache_repo.get_or_fill(key, fill, ttl=60))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(cache_repo.get_or_fill(key, fill, ttl=60)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        filler.cancel()
+
+        assert await asyncio.gather(*waiters) == [b'[]'] * 5
+        assert fills == 2
+
+    async def test_when_key_filled_before_lock_taken_then_not_filled_again(
+            self,
+            cache_repo: CacheRepository,
+    ) -> None:
+        """Тест заполняет ключ перед взятием блокировки и ожидает, что значение не строится повторно."""
+        key = f'test:{uuid.uuid4()}'
+        await cache_repo.store(key, b'"filled"', ttl=60)
+
+        async def fill() -> bytes:
+            raise AssertionError('value must be read from cache')
+
+        assert await cache_repo._fill_once(key, fill, None, ttl=60) == b'"filled"'
+
+    async def test_when_value_overwritten_then_other_worker_memory_cache_evicted(self, redis: Redis) -> None:
+        """Тест перезаписывает значение в одном воркере и ожидает, что другой воркер прочитает новое значение."""
+        key, hash_key = f'test:{uuid.uuid4()}', f'test:{uuid.uuid4()}'
+        writer_cache = LocalCache(max_bytes=1024 * 1024, ttl=60)
+        reader_cache = LocalCache(max_bytes=1024 * 1024, ttl=60)
+        writer = CacheRepository(redis, local_cache=writer_cache)
+        reader = CacheRepository(redis, local_cache=reader_cache)
+        listener = asyncio.create_task(reader_cache.listen(redis))
+        await asyncio.sleep(0.1)
+        try:
+            await writer.set(key, b'old', expire=60)
+            await writer.hset(hash_key, 'page', b'old', expire=60)
+            assert await reader.get(key) == b'old'
+            assert await reader.hget(hash_key, 'page') == b'old'
+
+            await writer.set(key, b'new', expire=60)
+            await writer.hset(hash_key, 'page', b'new', expire=60)
+            await asyncio.sleep(0.1)
+
+            assert reader_cache.get(key) is None
+            assert reader_cache.get(hash_key, 'page') is None
+            assert await reader.get(key) == b'new'
+            assert await reader.hget(hash_key, 'page') == b'new'
+        finally:
+            listener.cancel()
+            await redis.delete(key, hash_key)
@@ -103,6 +103,31 @@ class TestDishAPI:
         assert response.json()['description'] == new_dish.description
         assert response.json()['price'] == new_dish.price
 
+    @pytest.mark.usefixtures('create_dish_fixture')
+    async def test_when_dish_has_discount_then_price_discounted(
+            self,
+            client: AsyncClient,
+            dish_repo: DishRepository,
+            create_dish_fixture: tuple[Menu, Submenu, Dish],
+    ) -> None:
+        """Тест создает блюдо со скидкой и ожидает цену с учетом скидки."""
+        new_menu, new_submenu, _ = create_dish_fixture
+        discount_dish = await dish_repo.create_dish({
+            'title': 'Discount Dish',
+            'description': 'Discount Dish Description',
+            'price': '100.00',
+            'discount': '15',
+            'submenu_id': new_submenu.id,
+            'id': uuid.uuid4()
+        })
+
+        response = await client.get(
+            reverse('get_dish', menu_id=str(new_menu.id), submenu_id=str(new_submenu.id), dish_id=str(discount_dish.id))
+        )
+
+        assert response.status_code == 200
+        assert response.json()['price'] == '85.00'
+
     @pytest.mark.usefixtures('create_dish_fixture')
     async def test_when_update_dish_then_details_updated(
             self,
@@ -137,7 +162,7 @@ class TestDishAPI:
         assert response.json()['id'] == str(dish.id)
         assert response.json()['title'] == dish.title
         assert response.json()['description'] == dish.description
-        assert response.json()['price'] == dish.price
+        assert response.json()['price'] == str(dish.price)
 
     @pytest.mark.usefixtures('create_dish_fixture')
     async def test_when_delete_dish_then_it_is_removed(
@@ -161,3 +186,40 @@ class TestDishAPI:
 
         dish_deleted = await dish_repo.get_dish_by_id(new_dish.id)
         assert dish_deleted is None
+
+    @pytest.mark.usefixtures('create_dish_fixture')
+    async def test_when_price_not_finite_or_too_large_then_bad_request(
+            self,
+            client: AsyncClient,
+            create_dish_fixture: tuple[Menu, Submenu, Dish]
+    ) -> None:
+        """Тест создает блюда с ценой nan, inf и больше NUMERIC(10, 2) и ожидает 400 вместо ошибки БД."""
+        new_menu, new_submenu, _ = create_dish_fixture
+        url = reverse('create_dish', menu_id=str(new_menu.id), submenu_id=str(new_submenu.id))
+
+        for price in ('nan', 'inf', '100000000'):
+            response = await client.post(url, json={'title': 'dish', 'description': 'dish', 'price': price})
+            assert response.status_code == 400
+
+    @pytest.mark.usefixtures('create_dish_fixture')
+    async def test_when_menu_deleted_then_child_etags_no_longer_match(
+            self,
+            client: AsyncClient,
+            create_dish_fixture: tuple[Menu, Submenu, Dish]
+    ) -> None:
+        """Тест удаляет меню и ожидает 404 вместо 304 на условный запрос его подменю и блюда."""
+        new_menu, new_submenu, new_dish = create_dish_fixture
+        submenu_url = reverse('get_submenu', menu_id=str(new_menu.id), submenu_id=str(new_submenu.id))
+        dish_url = reverse(
+            'get_dish',
+            menu_id=str(new_menu.id),
+            submenu_id=str(new_submenu.id),
+            dish_id=str(new_dish.id),
+        )
+        submenu_etag = (await client.get(submenu_url)).headers['etag']
+        dish_etag = (await client.get(dish_url)).headers['etag']
+
+        await client.delete(reverse('delete_menu', menu_id=str(new_menu.id)))
+
+        assert (await client.get(submenu_url, headers={'If-None-Match': submenu_etag})).status_code == 404
+        assert (await client.get(dish_url, headers={'If-None-Match': dish_etag})).status_code == 404
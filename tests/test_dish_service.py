@@ -0,0 +1,11 @@
+from app.services.dish_service import try_parse_discount
+
+
+class TestDishService:
+    def test_when_discount_out_of_range_then_clamped(self) -> None:
+        """Тест ожидает, что скидка из таблицы ограничивается диапазоном 0-100, а мусор дает 0."""
+        assert try_parse_discount('15.5') == 15.5
+        assert try_parse_discount('150') == 100
+        assert try_parse_discount('-5') == 0
+        assert try_parse_discount('nan') == 0
+        assert try_parse_discount('abc') == 0
@@ -127,6 +127,50 @@ class TestFullMenuAPI:
         assert len(dishes_list_1) == 2
         assert len(dishes_list_2) == 2
 
+    @pytest.mark.usefixtures('create_menu_submenu_dish_fixture')
+    async def test_when_dish_created_then_cached_full_menu_invalidated(
+            self,
+            client: AsyncClient,
+            create_menu_submenu_dish_fixture: tuple[Menu, Submenu, Dish, Dish, Submenu, Dish, Dish]
+    ) -> None:
+        """Тест заполняет кэш полного меню, создает блюдо и ожидает его в ответе."""
+        new_menu1, new_submenu1_1, *_ = create_menu_submenu_dish_fixture
+
+        response = await client.get(reverse('get_full_menus'))
+        assert response.status_code == 200
+        assert len(response.json()[0]['submenus'][0]['dishes']) == 2
+
+        data_dish = {'title': 'пиво', 'description': 'пиво нефильтрованное', 'price': '95.00'}
+        response_dish = await client.post(
+            reverse('create_dish', menu_id=str(new_menu1.id), submenu_id=str(new_submenu1_1.id)),
+            json=data_dish
+        )
+        assert response_dish.status_code == 201
+
+        response = await client.get(reverse('get_full_menus'))
+        dishes_ids = [dish['id'] for dish in response.json()[0]['submenus'][0]['dishes']]
+        assert response_dish.json()['id'] in dishes_ids
+
+    @pytest.mark.usefixtures('create_menu_submenu_dish_fixture')
+    async def test_when_stream_menus_then_same_as_full_menus(
+            self,
+            client: AsyncClient,
+    ) -> None:
+        """Тест получает меню потоком и ожидает те же данные, что и в полном меню."""
+        response = await client.get(reverse('get_full_menus'))
+        response_stream = await client.get(reverse('stream_full_menus'))
+
+        assert response_stream.status_code == 200
+
+        def dishes_by_id(menus: list[dict]) -> dict[str, dict]:
+            return {
+                dish['id']: dish
+                for menu in menus for submenu in menu['submenus'] for dish in submenu['dishes']
+            }
+
+        assert [menu['id'] for menu in response_stream.json()] == [menu['id'] for menu in response.json()]
+        assert dishes_by_id(response_stream.json()) == dishes_by_id(response.json())
+
 
 """
 example = [
@@ -0,0 +1,42 @@
+import asyncio
+import uuid
+
+import pytest
+from aioredis import Redis
+
+from background.lease import LeaseLost, hold_lease
+
+
+class TestLease:
+    async def test_when_lease_held_then_second_holder_rejected_until_release(self, redis: Redis) -> None:
+        """Тест берет аренду дважды и ожидает отказ второму держателю, пока первый не отпустит ее."""
+        key = f'test:lease:{uuid.uuid4()}'
+
+        async with hold_lease(redis, key, ttl=0.3) as acquired:
+            assert acquired
+            # Аренда переживает свой срок, пока ее продлевает держатель.
+            await asyncio.sleep(0.5)
+            async with hold_lease(redis, key, ttl=0.3) as second_acquired:
+                assert not second_acquired
+
+        async with hold_lease(redis, key, ttl=0.3) as acquired:
+            assert acquired
+        assert not await redis.exists(key)
+
+    async def test_when_lease_taken_over_then_holder_stopped(self, redis: Redis) -> None:
+        """Тест передает аренду другому держателю и ожидает, что первый держатель прервет работу."""
+        key = f'test:lease:{uuid.uuid4()}'
+
+        async with hold_lease(redis, key, ttl=0.3) as lease:
+            assert lease is not None
+            lease.check()
+            await redis.set(key, 'other holder')
+            await asyncio.sleep(0.2)
+
+            assert lease.lost
+            with pytest.raises(LeaseLost):
+                lease.check()
+
+        # Чужую аренду держатель не снимает.
+        assert await redis.get(key) == b'other holder'
+        await redis.delete(key)
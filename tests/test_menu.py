@@ -117,3 +117,78 @@ class TestMenuAPI:
 
         menu_deleted = await menu_repo.get_menu_by_id(new_menu.id)
         assert menu_deleted is None
+
+    @pytest.mark.usefixtures('create_menu_fixture')
+    async def test_when_deleted_menu_requested_with_any_etag_then_not_found(
+            self,
+            client: AsyncClient,
+            create_menu_fixture: Menu,
+    ) -> None:
+        """Тест удаляет меню и ожидает 404, а не 304, на запрос с заголовком If-None-Match: *."""
+        new_menu = create_menu_fixture
+        await client.delete(reverse('delete_menu', menu_id=str(new_menu.id)))
+
+        response = await client.get(reverse('get_menu', menu_id=str(new_menu.id)), headers={'If-None-Match': '*'})
+
+        assert response.status_code == 404
+
+    async def test_when_get_menus_with_limit_then_paginated_by_id(
+            self,
+            client: AsyncClient,
+            menu_repo: MenuRepository,
+            cleanup_db: None,
+    ) -> None:
+        """Тест создает три меню и получает их двумя страницами по ID."""
+        menus_ids = sorted(uuid.uuid4() for _ in range(3))
+        for menu_id in menus_ids:
+            await menu_repo.create_menu({'title': 'menu', 'description': 'description', 'id': menu_id})
+
+        first_page = await client.get(reverse('get_menus'), params={'limit': 2})
+        second_page = await client.get(reverse('get_menus'), params={'limit': 2, 'after': first_page.json()[-1]['id']})
+
+        assert first_page.status_code == 200
+        assert [menu['id'] for menu in first_page.json()] == [str(menu_id) for menu_id in menus_ids[:2]]
+        assert [menu['id'] for menu in second_page.json()] == [str(menu_id) for menu_id in menus_ids[2:]]
+
+    @pytest.mark.usefixtures('create_menu_fixture')
+    async def test_when_get_menu_from_cache_then_same_body(
+            self,
+            client: AsyncClient,
+            create_menu_fixture: Menu,
+    ) -> None:
+        """Тест получает меню дважды и ожидает, что ответ из кэша совпадает с ответом из базы данных."""
+        new_menu = create_menu_fixture
+
+        first_response = await client.get(reverse('get_menu', menu_id=str(new_menu.id)))
+        cached_response = await client.get(reverse('get_menu', menu_id=str(new_menu.id)))
+
+        assert cached_response.status_code == 200
+        assert cached_response.headers['content-type'] == 'application/json'
+        assert cached_response.content == first_response.content
+
+    @pytest.mark.usefixtures('create_menu_fixture')
+    async def test_when_get_menu_with_etag_then_not_modified_until_update(
+            self,
+            client: AsyncClient,
+            create_menu_fixture: Menu,
+    ) -> None:
+        """Тест ожидает 304 на запрос с актуальным ETag и новый ответ после изменения меню."""
+        new_menu = create_menu_fixture
+        url = reverse('get_menu', menu_id=str(new_menu.id))
+
+        response = await client.get(url)
+        etag = response.headers['etag']
+        not_modified = await client.get(url, headers={'If-None-Match': etag})
+
+        assert not_modified.status_code == 304
+        assert not_modified.content == b''
+
+        await client.patch(
+            reverse('update_menu', menu_id=str(new_menu.id)),
+            json={'title': 'menu 1 update', 'description': 'description 1 update'}
+        )
+        modified = await client.get(url, headers={'If-None-Match': etag})
+
+        assert modified.status_code == 200
+        assert modified.headers['etag'] != etag
+        assert modified.json()['title'] == 'menu 1 update'
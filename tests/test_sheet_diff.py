@@ -0,0 +1,36 @@
+import uuid
+
+from background.sheet_diff import diff_rows, fingerprint
+
+
+class TestSheetDiff:
+    def test_when_rows_differ_then_diff_has_inserted_updated_and_deleted(self) -> None:
+        """Тест сравнивает строки из БД и таблицы и ожидает разбиение на вставку, обновление и удаление."""
+        kept_id, changed_id, deleted_id, new_id = (uuid.uuid4() for _ in range(4))
+        current = {
+            kept_id: {'id': kept_id, 'title': 'kept'},
+            changed_id: {'id': changed_id, 'title': 'old'},
+            deleted_id: {'id': deleted_id, 'title': 'deleted'},
+        }
+        desired = {
+            kept_id: {'id': kept_id, 'title': 'kept'},
+            changed_id: {'id': changed_id, 'title': 'new'},
+            new_id: {'id': new_id, 'title': 'new'},
+        }
+
+        diff = diff_rows(current, desired)
+
+        assert [row['id'] for row in diff.inserted] == [new_id]
+        assert [row['id'] for row in diff.updated] == [changed_id]
+        assert diff.deleted == [deleted_id]
+        assert not diff_rows(desired, desired)
+
+    def test_when_rows_reordered_then_fingerprint_same(self) -> None:
+        """Тест ожидает, что отпечаток таблицы не зависит от порядка строк и меняется при изменении данных."""
+        first_id, second_id = uuid.uuid4(), uuid.uuid4()
+        rows = {first_id: {'id': first_id, 'title': 'a'}, second_id: {'id': second_id, 'title': 'b'}}
+        reordered = {second_id: rows[second_id], first_id: rows[first_id]}
+        changed = {**rows, second_id: {'id': second_id, 'title': 'c'}}
+
+        assert fingerprint(rows) == fingerprint(reordered)
+        assert fingerprint(rows) != fingerprint(changed)
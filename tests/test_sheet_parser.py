@@ -0,0 +1,46 @@
+import uuid
+from decimal import Decimal
+
+import pytest
+
+from app.models import Dish, Menu, Submenu
+from background.sheet_parser import SheetParseError, iter_sheet_records, parse_sheet
+
+
+class TestSheetParser:
+    def test_when_rows_streamed_then_records_match_parse_sheet(self) -> None:
+        """Тест сравнивает потоковый разбор с parse_sheet и ожидает те же меню, подменю и блюда."""
+        menu_id, submenu_id, first_dish_id, second_dish_id, next_menu_id = (str(uuid.uuid4()) for _ in range(5))
+        rows = [
+            [menu_id, 'Меню', 'Основное меню', '', '', '', ''],
+            ['', submenu_id, 'Закуски', 'К пиву', '', '', ''],
+            ['', '', first_dish_id, 'Сельдь', 'Маринованная', '182,99', '10'],
+            ['', '', second_dish_id, 'Рулька', 'Свиная', '250', 'нет'],
+            [next_menu_id, 'Бар', 'Напитки', '', '', '', ''],
+            ['', '', '', 'Конец таблицы', '', '', ''],
+            [str(uuid.uuid4()), 'После конца', '', '', '', '', ''],
+        ]
+
+        records = list(iter_sheet_records(iter(rows)))
+
+        menus = parse_sheet(rows)
+        assert [record.row['id'] for record in records if record.model is Menu] == [menu.id for menu in menus]
+        assert [record.row for record in records if record.model is Submenu] == [
+            {'id': uuid.UUID(submenu_id), 'menu_id': uuid.UUID(menu_id), 'title': 'Закуски', 'description': 'К пиву'}
+        ]
+        dishes = [record.row for record in records if record.model is Dish]
+        assert [(dish['id'], dish['price'], dish['discount']) for dish in dishes] == [
+            (uuid.UUID(first_dish_id), Decimal('182.99'), Decimal('10.00')),
+            (uuid.UUID(second_dish_id), Decimal('250.00'), Decimal('0.00')),
+        ]
+
+    def test_when_price_invalid_then_parse_error_with_row(self) -> None:
+        """Тест разбирает блюдо с некорректной ценой и ожидает ошибку разбора с номером строки."""
+        rows = [
+            [str(uuid.uuid4()), 'Меню', '', '', '', '', ''],
+            ['', str(uuid.uuid4()), 'Закуски', '', '', '', ''],
+            ['', '', str(uuid.uuid4()), 'Сельдь', '', 'дорого', ''],
+        ]
+
+        with pytest.raises(SheetParseError, match='row 3, column 6'):
+            list(iter_sheet_records(rows))
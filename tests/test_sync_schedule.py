@@ -0,0 +1,25 @@
+from aioredis import Redis
+
+from app.config import SYNC_BEAT_INTERVAL, SYNC_INTERVAL_FACTOR
+from background.tasks import SYNC_COOLDOWN_KEY, SYNC_DURATIONS_KEY, schedule_next_run
+
+
+class TestSyncSchedule:
+    async def test_when_runs_slow_then_cooldown_set(self, redis: Redis) -> None:
+        """Тест записывает долгие запуски и ожидает паузу, на которую откладываются запуски от beat."""
+        await redis.delete(SYNC_DURATIONS_KEY, SYNC_COOLDOWN_KEY)
+        slow_run = 2 * SYNC_BEAT_INTERVAL / SYNC_INTERVAL_FACTOR
+
+        await schedule_next_run(redis, slow_run)
+
+        assert await redis.pttl(SYNC_COOLDOWN_KEY) > 0
+        await redis.delete(SYNC_DURATIONS_KEY, SYNC_COOLDOWN_KEY)
+
+    async def test_when_runs_fast_then_no_cooldown(self, redis: Redis) -> None:
+        """Тест записывает быстрые запуски и ожидает, что запуски от beat не пропускаются."""
+        await redis.delete(SYNC_DURATIONS_KEY, SYNC_COOLDOWN_KEY)
+
+        await schedule_next_run(redis, 0.1)
+
+        assert not await redis.exists(SYNC_COOLDOWN_KEY)
+        await redis.delete(SYNC_DURATIONS_KEY)
@@ -0,0 +1,34 @@
+from openpyxl import Workbook
+
+from background.sheet_parser import parse_sheet
+from background.xlsx_source import read_xlsx_rows
+
+
+class TestXlsxSource:
+    def test_when_workbook_has_ordinal_ids_then_rows_parsed_with_stable_uuids(self, tmp_path) -> None:
+        """Тест читает книгу с порядковыми номерами и ожидает одинаковые UUID при повторном чтении."""
+        path = tmp_path / 'Menu.xlsx'
+        workbook = Workbook()
+        sheet = workbook.worksheets[0]
+        sheet.append([1, 'Меню', 'Основное меню'])
+        sheet.append([None, 1, 'Закуски', 'К пиву'])
+        sheet.append([None, None, 1, 'Сельдь', 'Маринованная', 182.99, 10])
+        sheet.append([None, None, 2, 'Рулька', 'Свиная', 250])
+        sheet.append([])
+        sheet.append([2, 'Бар', 'Напитки'])
+        sheet.append([None, 1, 'Пиво', 'Разливное'])
+        sheet.append([None, None, 1, 'Светлое', 'Нефильтрованное', 150])
+        workbook.save(path)
+
+        menus = parse_sheet(list(read_xlsx_rows(str(path))))
+
+        assert [menu.title for menu in menus] == ['Меню', 'Бар']
+        dishes = [dish for menu in menus for submenu in menu.submenus for dish in submenu.dishes]
+        assert [(dish.title, dish.price, dish.discount) for dish in dishes] == [
+            ('Сельдь', '182.99', '10'),
+            ('Рулька', '250', ''),
+            ('Светлое', '150', ''),
+        ]
+        # Одинаковые порядковые номера в разных подменю дают разные ID.
+        assert len({dish.id for dish in dishes}) == 3
+        assert [menu.id for menu in parse_sheet(list(read_xlsx_rows(str(path))))] == [menu.id for menu in menus]